@@ -1,6 +1,13 @@
 import numpy as np
-from textwrap import wrap
 import math
+import os
+import sys
+import argparse
+import csv
+import itertools
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
 #Main method for program
 def main():
@@ -81,6 +88,28 @@ def main():
         print(format(int(adsbMsg, 2), 'x'))
 
 
+#DF 17 is ADS-B, CA is 5 for to match type code later
+DF17_HEADER = (17 << 3) | 5
+
+#method to generate aircraft ID fields (DF, CA, ICAO) as an int
+def aircraftIDInt(icao):
+    """
+    generates DF, CA, and ICAO fields of ADS-B message as a 32 bit int
+    DF (downlink format) Field: 5 Bits
+    CA (Capability identifiers): 3 bits
+    ICAO address: 24 bits
+
+    Args:
+        icao (int or string): ICAO address as an int or hex string
+    Returns:
+        int: the 32 bit header
+    """
+
+    if isinstance(icao, str):
+        icao = int(icao, 16)
+
+    return (DF17_HEADER << 24) | (icao & 0xFFFFFF)
+
 #method to generate aircraft ID fields (DF, CA, ICAO)
 def aircraftID(icao):
     """
@@ -88,25 +117,32 @@ def aircraftID(icao):
     DF (downlink format) Field: 5 Bits
     CA (Capability identifiers): 3 bits
     ICAO address: 24 bits
-    
+
+    returns a 32 character binary string
     """
 
-    #the message that we will be returning
-    msg = ''
+    return format(aircraftIDInt(icao), '032b')
 
-    #DF 17 is ADS-B
-    df = format(17, 'b')
-    
-    #CA is 5 for to match type code later
-    ca = format(5, 'b')
-    
-    #The full message
-    msg = msg + df + ca + format(int(icao,16),'b')
+#method to build a complete frame as bytes
+def buildFrame(icao, me):
+    """
+    Builds a complete DF17 frame, header, ME field, and parity
 
-    while (len(msg) < 32):
-        msg = "0" + msg
+    Args:
+        icao (int or string): ICAO address as an int or hex string
+        me (int): 56 bit ME field
+    Returns:
+        bytes: the 14 byte frame
+    """
+
+    data = ((aircraftIDInt(icao) << 56) | (me & 0xFFFFFFFFFFFFFF)).to_bytes(11, 'big')
+
+    return data + crc24(data).to_bytes(3, 'big')
 
-    return msg
+#converts a frame built with buildFrame back into the binary string format
+def frame2bin(frame):
+    """Convert a bytes frame to binary string, with zero fillings."""
+    return format(int.from_bytes(frame, 'big'), '0' + str(len(frame) * 8) + 'b')
 
 def hex2bin(hexstr):
     """Convert a hexdecimal string to binary string, with zero fillings."""
@@ -150,213 +186,1316 @@ def adsbMod(x, y):
     return float(x - (y * math.floor(x/y)))
 
 
+#Mode S CRC generator polynomial, without the leading x^24 term
+CRC_POLY = 0xFFF409
+
+#builds the byte at a time CRC lookup table
+def crcTable():
+    """
+    Builds the 256 entry lookup table for the Mode S CRC.
+    Entry n is the parity of byte n followed by three zero bytes.
+
+    Returns:
+        numpy array: 256 uint32 parity values
+    """
+
+    table = np.zeros(256, dtype=np.uint32)
+
+    for byte in range(256):
+        value = byte << 16
+
+        for ibit in range(8):
+            value = value << 1
+            if value & 0x1000000:
+                value = value ^ (0x1000000 | CRC_POLY)
+
+        table[byte] = value
+
+    return table
+
+CRC_TABLE = crcTable()
+
+#python list copy of the table, indexing a list is faster than a numpy array one value at a time
+CRC_LIST = CRC_TABLE.tolist()
+
+#table driven CRC
+def crc24(data, numBytes=11):
+    """
+    Table driven Mode-S CRC.
+
+    Args:
+        data (bytes or int): message without parity, as bytes or an int
+        numBytes (int): message length in bytes when data is an int
+
+    Returns:
+        int: 24 bit parity
+    """
+
+    if isinstance(data, int):
+        data = data.to_bytes(numBytes, 'big')
+
+    result = 0
+
+    for byte in data:
+        result = ((result << 8) & 0xFFFFFF) ^ CRC_LIST[(result >> 16) ^ byte]
+
+    return result
+
+#batch CRC
+def crcBatch(frames):
+    """
+    Table driven Mode-S CRC over many frames at once.
+
+    Args:
+        frames (numpy array): (N, bytes) uint8 array of messages without parity, (N, 11) for extended squitters
+
+    Returns:
+        numpy array: N uint32 parity values
+    """
+
+    frames = np.asarray(frames, dtype=np.uint8)
+    result = np.zeros(frames.shape[0], dtype=np.uint32)
+
+    #one table lookup per byte column, across every frame
+    for ibyte in range(frames.shape[1]):
+        result = ((result << 8) & 0xFFFFFF) ^ CRC_TABLE[(result >> 16) ^ frames[:, ibyte]]
+
+    return result
+
 #CRC method
 def crc(msg):
     """
     Mode-S Cyclic Redundancy Check.
-    Detect if bit error occurs in the Mode-S message. When encode option is on,
-    the checksum is generated.
+    Generates the parity bits for the given message.
     Args:
-        msg (string): 22 bytes hexadecimal message string
+        msg (string): binary string of the message without parity, 88 bits for an extended squitter
     Returns:
-        int: message checksum, or partity bits (encoder)
+        string: 24 character binary string of the parity bits
     """
-    # the CRC generator
-    G = [int("11111111", 2), int("11111010", 2), int("00000100", 2), int("10000000", 2)]
 
-    #adding crc bytes to messgae
-    #msg = msg + "000000"
-    msg = msg + "000000000000000000000000"
+    #leading zero bits do not change the CRC, so round up to whole bytes
+    result = crc24(int(msg, 2), (len(msg) + 7) // 8)
 
-    #msgbin = hex2bin(msg)
-    #msgbin_split = wrap(msgbin, 8)
-    msgbin_split = wrap(msg, 8)
-    mbytes = list(map(bin2int, msgbin_split))
+    return format(result, '024b')
 
-    for ibyte in range(len(mbytes) - 3):
-        for ibit in range(8):
-            mask = 0x80 >> ibit
-            bits = mbytes[ibyte] & mask
 
-            if bits > 0:
-                mbytes[ibyte] = mbytes[ibyte] ^ (G[0] >> ibit)
-                mbytes[ibyte + 1] = mbytes[ibyte + 1] ^ (
-                    0xFF & ((G[0] << 8 - ibit) | (G[1] >> ibit))
-                )
-                mbytes[ibyte + 2] = mbytes[ibyte + 2] ^ (
-                    0xFF & ((G[1] << 8 - ibit) | (G[2] >> ibit))
-                )
-                mbytes[ibyte + 3] = mbytes[ibyte + 3] ^ (
-                    0xFF & ((G[2] << 8 - ibit) | (G[3] >> ibit))
-                )
+#builds the per byte position CRC contribution table
+def crcByteTable(numBytes=11):
+    """
+    Builds the CRC contribution of every byte value at every byte position of a message.
+    The CRC is linear, so the parity of a message is the XOR of the contributions of its bytes.
+
+    Args:
+        numBytes (int): message length in bytes without parity
+    Returns:
+        numpy array: (numBytes, 256) uint32 array, entry [k][v] is the parity of a message that is all zero except byte k = v
+    """
+
+    messages = np.zeros((numBytes, 256, numBytes), dtype=np.uint8)
+    for ibyte in range(numBytes):
+        messages[ibyte, :, ibyte] = np.arange(256)
+
+    return crcBatch(messages.reshape(-1, numBytes)).reshape(numBytes, 256)
 
-    result = (mbytes[-3] << 16) | (mbytes[-2] << 8) | mbytes[-1]
+CRC_BYTE_TABLE = crcByteTable()
+CRC_BYTE_LIST = CRC_BYTE_TABLE.tolist()
 
-    result = str(format(result, 'b'))
+#the ME field is the last 7 bytes of the 11 byte message
+ME_OFFSET = 4
+
+#cached header parity
+@lru_cache(maxsize=65536)
+def crcHeader(icao):
+    """
+    CRC contribution of the DF, CA, and ICAO fields, cached per aircraft
 
-    while (len(result) < 24):
-        result =  "0" + result
+    Args:
+        icao (int or string): ICAO address as an int or hex string
+    Returns:
+        int: 24 bit parity of the header followed by an all zero ME field
+    """
+
+    return crc24(aircraftIDInt(icao) << 56)
+
+#ME field parity
+def crcME(me):
+    """
+    CRC contribution of a 56 bit ME field, XOR with crcHeader() for the full parity
+    """
 
-    #print(result)
+    result = 0
+
+    for ibyte in range(7):
+        result = result ^ CRC_BYTE_LIST[ME_OFFSET + ibyte][(me >> (8 * (6 - ibyte))) & 0xFF]
 
     return result
-    #eturn format(int(result, 2), 'x')
 
+#incremental parity update
+def crcDelta(parity, oldME, newME):
+    """
+    Updates the parity of a frame when its ME field changes, only looking up the bytes that changed
 
-#Position method (Lat, Lon, Alt)
-def position(lat, lon, alt, odd):
+    Args:
+        parity (int): 24 bit parity of the frame with oldME
+        oldME (int): the previous 56 bit ME field
+        newME (int): the new 56 bit ME field
+    Returns:
+        int: 24 bit parity of the frame with newME
     """
-    Mode S extended positon generator.  
-    Takes in lat, lon, and alt as ints
-    Takes in odd as a boolean for even/odd frame
 
-    Type code hard coded to 0x58
+    delta = oldME ^ newME
+
+    for ibyte in range(7):
+        value = (delta >> (8 * (6 - ibyte))) & 0xFF
+        if value:
+            parity = parity ^ CRC_BYTE_LIST[ME_OFFSET + ibyte][value]
+
+    return parity
+
+#batch ME field parity
+def crcMEBatch(me):
+    """
+    CRC contributions of an array of 56 bit ME fields, see crcME()
 
-    returns a hex string
+    Args:
+        me (numpy array): uint64 ME fields
+    Returns:
+        numpy array: uint32 parity contributions
     """
 
-    #perform altitude and TC math
-    altitude = (alt + 1000)/25
+    me = np.asarray(me, dtype=np.uint64)
+    result = np.zeros(me.shape, dtype=np.uint32)
 
-    #explicitly casting as int because python can be dumb
-    altitude = int(altitude)
+    for ibyte in range(7):
+        values = ((me >> np.uint64(8 * (6 - ibyte))) & np.uint64(0xFF)).astype(np.intp)
+        result = result ^ CRC_BYTE_TABLE[ME_OFFSET + ibyte][values]
+
+    return result
 
-    hold = (altitude & 0x00F)
-    altitude = (altitude & 0xFF0) << 1
-    altitude = (altitude | hold); #concatenate to the entire message
-    altitude = (altitude | 0x010)
-    altitude = (altitude | 0x58000) #Takes on the TC (0x58) field
+#altitude range covered by the lookup tables, Gillham coding reaches from -1200 ft to 126700 ft
+ALT_MIN = -1200
+ALT_MAX = 126700
+ALT_STEP = 25
 
-    #formating altitude into bin string
-    altitude = str(format(altitude, 'b'))
-    
-    #print("alt: " +  altitude)
+#Gillham altitude code method
+def gillhamCode(alt):
+    """
+    12 bit altitude field with the Q bit clear, Gillham coded in 100 ft steps
 
-    while (len(altitude) < 20):
-        altitude = "0" + altitude
+    Args:
+        alt (int): altitude in feet, a multiple of 100 between ALT_MIN and ALT_MAX
+    Returns:
+        int: the altitude field, bits C1 A1 C2 A2 C4 A4 B1 Q B2 D2 B4 D4
+    """
 
-    #Calculate LatLon ------------------------
+    #500 ft steps are gray coded, 100 ft steps use a 5 cycle code that runs backwards on odd 500s
+    n500 = (alt + 1200) // 500
+    n100 = (alt + 1300 - n500 * 500) // 100
 
-    #utc bit hardcoded to zero
-    utcBit = "0"
+    if n500 % 2:
+        n100 = 6 - n100
+    if n100 == 5:
+        n100 = 7
+
+    gray500 = n500 ^ (n500 >> 1) # D2 D4 A1 A2 A4 B1 B2 B4
+    gray100 = n100 ^ (n100 >> 1) # C1 C2 C4
+
+    bit = lambda value, index, width: (value >> (width - 1 - index)) & 1
+
+    d2, d4, a1, a2, a4, b1, b2, b4 = [bit(gray500, i, 8) for i in range(8)]
+    c1, c2, c4 = [bit(gray100, i, 3) for i in range(3)]
+
+    code = 0
+    for value in (c1, a1, c2, a2, c4, a4, b1, 0, b2, d2, b4, d4):
+        code = (code << 1) | value
+
+    return code
+
+#builds the altitude lookup tables
+def altitudeTables():
+    """
+    Builds the altitude field lookup tables, one entry per 25 ft from ALT_MIN to ALT_MAX
+
+    Returns:
+        tuple: (Q bit table with -1 where 25 ft coding can not reach, Gillham table rounded to the nearest 100 ft) as int64 arrays
+    """
+
+    steps = np.arange(ALT_MIN, ALT_MAX + ALT_STEP, ALT_STEP)
+
+    #25 ft coding, 11 bits with the Q bit dropped into the middle
+    n = (steps + 1000) // 25
+    qTable = ((n & 0x7F0) << 1) | (n & 0x00F) | 0x010
+    qTable = np.where((n >= 0) & (n <= 0x7FF), qTable, -1)
+
+    hundreds = np.clip(np.round(steps / 100.0) * 100, ALT_MIN, ALT_MAX).astype(np.int64)
+    gillhamTable = np.array([gillhamCode(int(h)) for h in hundreds], dtype=np.int64)
+
+    return qTable.astype(np.int64), gillhamTable
+
+Q_TABLE, GILLHAM_TABLE = altitudeTables()
+Q_LIST = Q_TABLE.tolist()
+GILLHAM_LIST = GILLHAM_TABLE.tolist()
+
+#Altitude field method
+def altitudeField(alt, gillham=False):
+    """
+    12 bit altitude field from the lookup tables.
+    Uses 25 ft Q bit coding when the altitude fits, otherwise 100 ft Gillham coding.
+
+    Args:
+        alt (int): altitude in feet
+        gillham (bool): always use Gillham coding
+    Returns:
+        int: the altitude field
+    """
+
+    index = min(max(int((alt - ALT_MIN) // ALT_STEP), 0), len(Q_LIST) - 1)
+
+    if not gillham and Q_LIST[index] >= 0:
+        return Q_LIST[index]
+
+    return GILLHAM_LIST[index]
+
+#CPR method
+def cprFields(lat, lon, odd):
+    """
+    CPR encodes the given position
+
+    Args:
+        lat (float): latitude in degrees
+        lon (float): longitude in degrees
+        odd (bool): True for an odd frame, False for even
+    Returns:
+        tuple: (17 bit lat, 17 bit lon) as ints
+    """
 
     #cpr bit for even odd pairing
-    if (odd):
-        cpr = 1
-        cprBit = "1"
-    else:
-        cpr = 0
-        cprBit = "0"
+    cpr = 1 if odd else 0
 
     #NZ is hardcoded to 15 for our messages
     nz = 15
 
-    #NB is hardcoded to 17 for 17 bits
-    nb = 17
+    #2^NB, NB is hardcoded to 17 for 17 bits
+    scale = 131072
 
     #the latitude zone in the north south direction
-    dlat = float(360.0 / (4.0 * nz - cpr))
+    dlat = 360.0 / (4.0 * nz - cpr)
 
-    #print("dalt: " + str(dlat))
+    #the y coordinate within the zone
+    yZi = round(adsbMod(lat, dlat) / dlat * scale)
 
-    #latitude for mod operations
-    if lat < 0:
-        modLat = lat + 360.0
-    else:
-        modLat = float(lat)
+    #the latitude the receiver will decode, NL has to match what it will use
+    rLat = dlat * (yZi / scale + math.floor(lat / dlat))
 
-    #the y coordinate within the zone
-    #int YZi = (int) Math.round(Math.pow(2, Nb) * ((modLat % Dlat)/ Dlat));
-    #yZi = round(math.pow(2,nb)) * (adsbMod(modLat, dlat) / dlat)
-    yZi = float(adsbMod(lat, dlat))
-    yZi = yZi / dlat
-    yZi = yZi * math.pow(2, nb)
-    yZi = round(yZi)
-
-    #print("yZi: " + str(yZi))
-    
-
-    #the latitude that the receiver will decode
-    #rLat = dlat * ((yZi / math.pow(2, nb))) + math.floor(lat / dlat)
-    rLat = float(yZi) / math.pow(2, nb)
-    rLat = rLat + math.floor(lat / dlat)
-    rLat = rLat * dlat
-
-    #print("RLat: " + str(rLat))
-
-    #NLat is based on latitude given
-    if (abs(lat) > 87):
+    #NLat is based on the decoded latitude
+    if (abs(rLat) > 87):
         nlLat = 1
-    elif (abs(lat) == 87):
+    elif (abs(rLat) == 87):
         nlLat = 2
     else:
-        nlLat = math.floor((2*math.pi)/(math.acos(1 - ((1 - math.cos(math.pi / (2 * nz)))/(math.cos((math.pi / 180) * lat)**2)))))
-        #nlLat = math.floor( math.pow * 2 * (math.pow(math.acos(1 - ((1 - math.cos(math.pi / (2 * nz))) / (math.pow(math.cos((math.pi / 180) * abs(float(rLat))), 2)))), -1)) )
-
+        nlLat = math.floor((2*math.pi)/(math.acos(1 - ((1 - math.cos(math.pi / (2 * nz)))/(math.cos((math.pi / 180) * rLat)**2)))))
 
     #Longitude calcs
-
     if ((nlLat - cpr) - cpr) > 0:
         dLon = 360.0 / (nlLat - cpr)
     else:
         dLon = 360.0
 
     #the X coordinates within the zone
-    xZi = adsbMod(lon , dLon)
-    xZi = xZi / dLon
-    xZi = round(xZi * math.pow(2, nb))
+    xZi = round(adsbMod(lon, dLon) / dLon * scale)
 
     #make sure the values are nb bits
-    yZi = adsbMod(yZi, pow(2,nb))
-    xZi = adsbMod(xZi, pow(2, nb))
+    return yZi % scale, xZi % scale
 
-    #print("yZi: " + str(yZi))
-    #print(str(format(int(yZi), 'x')))
-    yBin = str(format(int(yZi), 'b'))
+#Position ME field method
+def positionME(lat, lon, alt, odd):
+    """
+    Mode S extended position ME field as a 56 bit int.
+    Type code hard coded to 0x58, utc bit hard coded to zero
+    """
 
-    while (len(yBin) < 17):
-        yBin = "0" + yBin
+    yZi, xZi = cprFields(lat, lon, odd)
 
-    #print("xZi: " + str(xZi))
-    #print(str(format(int(xZi), 'x')))
-    xBin = str(format(int(xZi), 'b'))
+    return (0x58 << 48) | (altitudeField(alt) << 36) | ((1 if odd else 0) << 34) | (yZi << 17) | xZi
 
-    while (len(xBin) < 17):
-        xBin = "0" + xBin
+#NL transition latitudes, entry i is the latitude where NL drops from 59 - i to 58 - i
+NL_TRANSITIONS = np.degrees(np.arccos(np.sqrt((1 - np.cos(np.pi / 30)) / (1 - np.cos(2 * np.pi / np.arange(59, 1, -1))))))
 
-    locMsg = altitude + utcBit + cprBit + yBin + xBin
+#batch NL method
+def nlBatch(lat):
+    """
+    Number of longitude zones for an array of latitudes, looked up from the transition latitudes
 
-    #print("bin: " + locMsg)
-    #print("hex: " + str(format(int(locMsg,2), 'x')))
+    Args:
+        lat (numpy array): latitudes in degrees
+    Returns:
+        numpy array: NL values from 1 to 59
+    """
 
+    absLat = np.abs(lat)
 
-    return locMsg
+    #NL is one more than the number of transitions above the latitude
+    nl = 59 - np.searchsorted(NL_TRANSITIONS, absLat, side='right')
 
-#converts our string into the encoding style needed to transmit
-def encodeMsg(msg):
+    return np.where(absLat == 87, 2, nl)
+
+#batch altitude field method
+def altitudeFieldBatch(alt, gillham=False):
+    """
+    12 bit altitude fields for an array of altitudes, one table lookup each, see altitudeField()
     """
-    Mode S encoder that converts the given binary message into the Mode S encoding
-    Also adds preamble.
 
-    Returns a binary string of the preamble and encoded message - note needs to transmit at 2Mbps
+    index = np.floor((np.asarray(alt, dtype=np.float64) - ALT_MIN) / ALT_STEP).astype(np.int64)
+    index = np.clip(index, 0, len(Q_TABLE) - 1)
+
+    if gillham:
+        return GILLHAM_TABLE[index]
+
+    qCode = Q_TABLE[index]
+
+    return np.where(qCode >= 0, qCode, GILLHAM_TABLE[index])
+
+#batch CPR method
+def cprBatch(lat, lon, odd):
+    """
+    CPR encodes arrays of positions, see cprFields()
+
+    Args:
+        lat (numpy array): latitudes in degrees
+        lon (numpy array): longitudes in degrees
+        odd (numpy array): True for odd frames, False for even
+    Returns:
+        tuple: (17 bit lat, 17 bit lon) int64 arrays
+    """
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    cpr = np.asarray(odd, dtype=np.int64)
+
+    scale = 131072
+
+    #the latitude zone in the north south direction, NZ is 15
+    dlat = 360.0 / (60.0 - cpr)
+    yZi = np.round((lat - dlat * np.floor(lat / dlat)) / dlat * scale).astype(np.int64)
+
+    #longitude zone size from NL at the latitude the receiver will decode
+    rLat = dlat * (yZi / scale + np.floor(lat / dlat))
+    nl = nlBatch(rLat)
+    dLon = np.where((nl - cpr - cpr) > 0, 360.0 / np.maximum(nl - cpr, 1), 360.0)
+    xZi = np.round((lon - dLon * np.floor(lon / dLon)) / dLon * scale).astype(np.int64)
+
+    return yZi % scale, xZi % scale
+
+#batch position ME field method
+def positionBatch(lat, lon, alt, odd):
+    """
+    Mode S extended position ME fields for arrays of aircraft, see positionME()
+
+    Args:
+        lat (numpy array): latitudes in degrees
+        lon (numpy array): longitudes in degrees
+        alt (numpy array): altitudes in feet
+        odd (numpy array): True for odd frames, False for even
+    Returns:
+        numpy array: 56 bit ME fields as uint64
+    """
+
+    yZi, xZi = cprBatch(lat, lon, odd)
+    cpr = np.asarray(odd, dtype=np.int64)
+
+    me = (0x58 << 48) | (altitudeFieldBatch(alt) << 36) | (cpr << 34) | (yZi << 17) | xZi
+
+    return me.astype(np.uint64)
+
+#Position method (Lat, Lon, Alt)
+def position(lat, lon, alt, odd):
+    """
+    Mode S extended positon generator.  
+    Takes in lat, lon, and alt as ints
+    Takes in odd as a boolean for even/odd frame
+
+    Type code hard coded to 0x58
+
+    returns a 56 character binary string
+    """
+
+    return format(positionME(lat, lon, alt, odd), '056b')
+
+#Velocity ME field method
+def velocityME(east, north, vrate):
+    """
+    Airborne velocity ME field as a 56 bit int, type code 19 subtype 1 (ground speed)
+    Vertical rate source is barometric, NUC and altitude difference are zero
+
+    Args:
+        east (float): east velocity in knots, negative for west
+        north (float): north velocity in knots, negative for south
+        vrate (float): vertical rate in feet per minute, negative for descending
+    Returns:
+        int: the ME field
+    """
+
+    #speeds are sent as magnitude + 1 with a direction bit, zero means no information
+    vew = min(1023, int(round(abs(east))) + 1)
+    vns = min(1023, int(round(abs(north))) + 1)
+    vr = min(511, int(round(abs(vrate) / 64)) + 1)
+
+    me = (19 << 51) | (1 << 48)
+    me = me | ((1 if east < 0 else 0) << 42) | (vew << 32)
+    me = me | ((1 if north < 0 else 0) << 31) | (vns << 21)
+    me = me | (1 << 20) | ((1 if vrate < 0 else 0) << 19) | (vr << 10)
+
+    return me
+
+#Velocity method
+def velocity(east, north, vrate):
+    """
+    Mode S airborne velocity generator.
+    Takes in east and north velocity in knots and vertical rate in feet per minute
+
+    returns a 56 character binary string
+    """
+
+    return format(velocityME(east, north, vrate), '056b')
+
+#batch velocity ME field method
+def velocityBatch(east, north, vrate):
+    """
+    Airborne velocity ME fields for arrays of aircraft, see velocityME()
+
+    Args:
+        east (numpy array): east velocities in knots
+        north (numpy array): north velocities in knots
+        vrate (numpy array): vertical rates in feet per minute
+    Returns:
+        numpy array: 56 bit ME fields as uint64
+    """
+
+    east = np.asarray(east, dtype=np.float64)
+    north = np.asarray(north, dtype=np.float64)
+    vrate = np.asarray(vrate, dtype=np.float64)
+
+    vew = np.minimum(1023, np.round(np.abs(east)).astype(np.int64) + 1)
+    vns = np.minimum(1023, np.round(np.abs(north)).astype(np.int64) + 1)
+    vr = np.minimum(511, np.round(np.abs(vrate) / 64).astype(np.int64) + 1)
+
+    me = (19 << 51) | (1 << 48) | (1 << 20) | (vew << 32) | (vns << 21) | (vr << 10)
+    me = me | ((east < 0).astype(np.int64) << 42) | ((north < 0).astype(np.int64) << 31) | ((vrate < 0).astype(np.int64) << 19)
+
+    return me.astype(np.uint64)
+
+#velocity from position updates
+def velocityFromPositions(lat0, lon0, alt0, lat1, lon1, alt1, dt):
+    """
+    Estimates velocities from two successive position updates, flat earth over the short step
+
+    Args:
+        lat0, lon0, alt0 (numpy array): previous positions in degrees and feet
+        lat1, lon1, alt1 (numpy array): current positions in degrees and feet
+        dt (float or numpy array): seconds between the updates
+    Returns:
+        tuple: (east knots, north knots, vertical rate feet per minute) arrays for velocityBatch()
+    """
+
+    lat0, lat1 = np.asarray(lat0, dtype=np.float64), np.asarray(lat1, dtype=np.float64)
+    lon0, lon1 = np.asarray(lon0, dtype=np.float64), np.asarray(lon1, dtype=np.float64)
+    hours = np.asarray(dt, dtype=np.float64) / 3600.0
+
+    #wrap the longitude step across the antimeridian
+    dLon = (lon1 - lon0 + 180.0) % 360.0 - 180.0
+
+    #one minute of latitude is one nautical mile
+    north = (lat1 - lat0) * 60.0 / hours
+    east = dLon * 60.0 * np.cos(np.radians((lat0 + lat1) / 2)) / hours
+    vrate = (np.asarray(alt1, dtype=np.float64) - np.asarray(alt0, dtype=np.float64)) / (hours * 60.0)
+
+    return east, north, vrate
+
+#callsign characters, the index of each character is its 6 bit code
+CALLSIGN_CHARS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######"
+
+#builds the ASCII to 6 bit callsign code table
+def callsignTable():
+    """
+    Builds the lookup table from ASCII byte to 6 bit callsign character code.
+    Lowercase letters map to uppercase, anything that can not be sent maps to a space.
+
+    Returns:
+        numpy array: 256 entry uint64 table
+    """
+
+    table = np.full(256, CALLSIGN_CHARS.index(' '), dtype=np.uint64)
+
+    for code, char in enumerate(CALLSIGN_CHARS):
+        if char != '#':
+            table[ord(char)] = code
+            table[ord(char.lower())] = code
+
+    return table
+
+CALLSIGN_TABLE = callsignTable()
+CALLSIGN_LIST = CALLSIGN_TABLE.tolist()
+
+#Identification ME field method
+@lru_cache(maxsize=65536)
+def identificationME(callsign, typeCode=4, category=0):
+    """
+    Aircraft identification ME field as a 56 bit int, cached since callsigns do not change
+
+    Args:
+        callsign (string): up to 8 characters, padded with spaces
+        typeCode (int): 1 to 4, the emitter category set
+        category (int): 3 bit emitter category within the set
+    Returns:
+        int: the ME field
+    """
+
+    chars = 0
+
+    for char in callsign.ljust(8)[:8].encode('ascii', 'replace'):
+        chars = (chars << 6) | CALLSIGN_LIST[char]
+
+    return ((typeCode & 0x1F) << 51) | ((category & 0x7) << 48) | chars
+
+#Identification method
+def identification(callsign):
+    """
+    Mode S aircraft identification generator.
+    Takes in a callsign of up to 8 characters
+
+    Type code hard coded to 4
+
+    returns a 56 character binary string
+    """
+
+    return format(identificationME(callsign), '056b')
+
+#batch identification ME field method
+def identificationBatch(callsigns, typeCode=4, category=0):
+    """
+    Aircraft identification ME fields for many callsigns at once, see identificationME()
+
+    Args:
+        callsigns (list or numpy array): callsign strings, or an 'S8' bytes array
+        typeCode (int or numpy array): 1 to 4, the emitter category set
+        category (int or numpy array): 3 bit emitter category within the set
+    Returns:
+        numpy array: 56 bit ME fields as uint64
+    """
+
+    callsigns = np.asarray(callsigns)
+
+    #non ASCII characters become '?' and then spaces, the same as identificationME()
+    if callsigns.dtype.kind == 'U':
+        callsigns = np.char.encode(callsigns, 'ascii', 'replace')
+
+    #fixed width bytes, short callsigns are padded with zero bytes which map to spaces
+    chars = np.ascontiguousarray(callsigns.astype('S8')).view(np.uint8).reshape(-1, 8)
+    codes = CALLSIGN_TABLE[chars]
+
+    me = (np.asarray(typeCode, dtype=np.uint64) & np.uint64(0x1F)) << np.uint64(51)
+    me = me | ((np.asarray(category, dtype=np.uint64) & np.uint64(0x7)) << np.uint64(48))
+
+    for ichar in range(8):
+        me = me | (codes[:, ichar] << np.uint64(42 - 6 * ichar))
+
+    return me
+
+#memoized position frame template
+@lru_cache(maxsize=4096)
+def positionTemplate(icao, altField, typeCode=0x58):
+    """
+    Pre-packed position frame with everything but the CPR bits filled in, cached per aircraft
+
+    Args:
+        icao (int): 24 bit ICAO address
+        altField (int): 12 bit altitude field from altitudeField()
+        typeCode (int): the 8 bit type code, surveillance status, and SAF field
+    Returns:
+        tuple: (88 bit message with zero CPR bits, 24 bit parity of that message)
+    """
+
+    me = (typeCode << 48) | (altField << 36)
+
+    return (aircraftIDInt(icao) << 56) | me, crcHeader(icao) ^ crcME(me)
+
+#position frame method
+def positionFrame(icao, lat, lon, alt, odd):
+    """
+    Builds a complete position frame from the cached template, only the CPR bits and their parity are computed
+
+    Args:
+        icao (int or string): ICAO address as an int or hex string
+        lat (float): latitude in degrees
+        lon (float): longitude in degrees
+        alt (int): altitude in feet
+        odd (bool): True for an odd frame, False for even
+    Returns:
+        bytes: the 14 byte frame, same as buildFrame(icao, positionME(lat, lon, alt, odd))
+    """
+
+    if isinstance(icao, str):
+        icao = int(icao, 16)
+
+    message, parity = positionTemplate(icao, altitudeField(alt))
+
+    yZi, xZi = cprFields(lat, lon, odd)
+    cprBits = ((1 if odd else 0) << 34) | (yZi << 17) | xZi
+
+    return (((message | cprBits) << 24) | crcDelta(parity, 0, cprBits)).to_bytes(14, 'big')
+
+#fleet record layout accepted by encodeFleet
+FLEET_DTYPE = np.dtype([('icao', np.uint32), ('lat', np.float64), ('lon', np.float64), ('alt', np.int32), ('odd', np.bool_)])
+
+#batch frame builder
+def frameBatch(icao, me):
+    """
+    Builds complete DF17 frames for arrays of ICAO addresses and ME fields
+
+    Args:
+        icao (numpy array): 24 bit ICAO addresses
+        me (numpy array): 56 bit ME fields as uint64
+    Returns:
+        numpy array: (N, 14) uint8 array of frames including parity
+    """
+
+    header = (np.uint64(DF17_HEADER << 24) | (np.asarray(icao, dtype=np.uint64) & np.uint64(0xFFFFFF)))
+    me = np.asarray(me, dtype=np.uint64)
+
+    frames = np.empty((len(me), 14), dtype=np.uint8)
+
+    for ibyte in range(4):
+        frames[:, ibyte] = header >> np.uint64(8 * (3 - ibyte))
+
+    for ibyte in range(7):
+        frames[:, ME_OFFSET + ibyte] = me >> np.uint64(8 * (6 - ibyte))
+
+    parity = crcBatch(frames[:, :11])
+
+    for ibyte in range(3):
+        frames[:, 11 + ibyte] = parity >> (8 * (2 - ibyte))
+
+    return frames
+
+#fleet encoder
+def encodeFleet(fleet=None, icao=None, lat=None, lon=None, alt=None, odd=None, workers=1, executor=None):
+    """
+    Encodes position frames for a whole fleet in one pass
+
+    Takes either a structured array with icao, lat, lon, alt, and odd fields (see FLEET_DTYPE),
+    an AircraftStates table, or the same values as separate column arrays.  With workers above 1
+    or an executor the fleet is split across a process pool, see encodeFleetParallel()
+
+    Returns:
+        numpy array: (N, 14) uint8 array of frames including parity, one row per aircraft
+    """
+
+    if fleet is None:
+        fleet = np.empty(len(icao), dtype=FLEET_DTYPE)
+        fleet['icao'], fleet['lat'], fleet['lon'], fleet['alt'], fleet['odd'] = icao, lat, lon, alt, odd
+
+    if executor is not None or (workers is not None and workers > 1):
+        if isinstance(fleet, AircraftStates):
+            fleet = fleet.records()
+
+        return encodeFleetParallel(fleet, workers if workers is not None and workers > 1 else None, executor)
+
+    return frameBatch(fleet['icao'], positionBatch(fleet['lat'], fleet['lon'], fleet['alt'], fleet['odd']))
+
+#process pool worker for encodeFleetParallel
+def encodeShard(fleetName, framesName, dtype, numAircraft, start, stop):
     """
+    Encodes one slice of a fleet held in shared memory into the shared output array
+
+    Args:
+        fleetName (string): shared memory block holding the fleet records
+        framesName (string): shared memory block holding the (N, 14) output frames
+        dtype (numpy dtype): the fleet record type
+        numAircraft (int): total number of aircraft in the fleet
+        start (int): first aircraft of this shard
+        stop (int): one past the last aircraft of this shard
+    """
+
+    fleetMem = shared_memory.SharedMemory(name=fleetName)
+    framesMem = shared_memory.SharedMemory(name=framesName)
 
-    #the message preamble to turn on IFF reciever
-    preamble = "1010000101000000"
+    try:
+        fleet = np.ndarray((numAircraft,), dtype=dtype, buffer=fleetMem.buf)
+        frames = np.ndarray((numAircraft, 14), dtype=np.uint8, buffer=framesMem.buf)
 
-    #end spce to give us room for when we transmit back to back
-    endSpace = "000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000"
+        frames[start:stop] = encodeFleet(fleet[start:stop])
+
+        #drop the views before closing so the buffers can be released
+        del fleet, frames
+    finally:
+        fleetMem.close()
+        framesMem.close()
+
+#sharded fleet encoder
+def encodeFleetParallel(fleet, workers=None, executor=None):
+    """
+    Encodes a fleet across a process pool.
+    The fleet is copied into shared memory once and every worker writes its slice of frames straight
+    into a shared output array, so only the shard bounds are pickled.
+
+    Args:
+        fleet (numpy array): structured array with icao, lat, lon, alt, and odd fields
+        workers (int): number of shards, defaults to the number of cores
+        executor (ProcessPoolExecutor): pool to run the shards on, reuse one across calls to skip
+                                        process startup, a pool is made for this call if None
+    Returns:
+        numpy array: (N, 14) uint8 array of frames including parity
+    """
 
-    encodedMsg = ""
+    numAircraft = len(fleet)
+    if numAircraft == 0:
+        return np.empty((0, 14), dtype=np.uint8)
 
-    for i in range(0, len(msg)):
-        if (msg[i] == '1'):
-            encodedMsg = encodedMsg + "10"
+    fleetMem = shared_memory.SharedMemory(create=True, size=max(1, fleet.nbytes))
+    framesMem = shared_memory.SharedMemory(create=True, size=numAircraft * 14)
+
+    try:
+        sharedFleet = np.ndarray(fleet.shape, dtype=fleet.dtype, buffer=fleetMem.buf)
+        sharedFleet[:] = fleet
+
+        numShards = workers or os.cpu_count() or 1
+        bounds = np.linspace(0, numAircraft, numShards + 1).astype(int)
+
+        if executor is None:
+            pool = ProcessPoolExecutor(numShards)
         else:
-            encodedMsg = encodedMsg + "01"
+            pool = executor
+
+        try:
+            jobs = [pool.submit(encodeShard, fleetMem.name, framesMem.name, fleet.dtype, numAircraft, bounds[i], bounds[i + 1])
+                    for i in range(numShards) if bounds[i + 1] > bounds[i]]
+
+            for job in jobs:
+                job.result()
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+        frames = np.ndarray((numAircraft, 14), dtype=np.uint8, buffer=framesMem.buf).copy()
+
+        del sharedFleet
+    finally:
+        fleetMem.close()
+        fleetMem.unlink()
+        framesMem.close()
+        framesMem.unlink()
+
+    return frames
+
+#aircraft state record, one row per aircraft, shared by the encoders and imagePlotter.py
+AIRCRAFT_DTYPE = np.dtype([('icao', np.uint32), ('lat', np.float64), ('lon', np.float64), ('alt', np.int32),
+                           ('east', np.float32), ('north', np.float32), ('vrate', np.float32),
+                           ('odd', np.bool_), ('nextDue', np.float64)])
+
+#accessor for one aircraft of an AircraftStates table
+class AircraftView:
+    """
+    Lightweight view of one aircraft, reads and writes go straight to the table columns
+    """
+
+    __slots__ = ('states', 'index')
+
+    def __init__(self, states, index):
+        """
+        Initialization method
+
+        Args:
+            states (AircraftStates): the table the aircraft lives in
+            index (int): the aircraft's row
+        """
+
+        self.states = states
+        self.index = index
+
+    def __repr__(self):
+        return "AircraftView(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in AIRCRAFT_DTYPE.names) + ")"
+
+def _viewProperty(name):
+    """
+    Builds the AircraftView property for one column
+    """
+
+    def getter(view):
+        return view.states.columns[name][view.index].item()
+
+    def setter(view, value):
+        view.states.columns[name][view.index] = value
+
+    return property(getter, setter)
+
+for _name in AIRCRAFT_DTYPE.names:
+    setattr(AircraftView, _name, _viewProperty(_name))
+
+#column wise table of aircraft state
+class AircraftStates:
+    """
+    Table of aircraft state with one contiguous array per AIRCRAFT_DTYPE field.
+    Indexing with a field name gives that column, so the table can be passed anywhere a
+    FLEET_DTYPE array is accepted, and indexing with an int gives an AircraftView.
+    """
+
+    def __init__(self, capacity=16):
+        """
+        Initialization method
+
+        Args:
+            capacity (int): number of aircraft to allocate room for, grows as needed
+        """
+
+        self.count = 0
+        self.columns = {name: np.zeros(capacity, dtype=AIRCRAFT_DTYPE[name]) for name in AIRCRAFT_DTYPE.names}
+
+    @classmethod
+    def fromColumns(cls, icao, lat, lon, alt=0, east=0, north=0, vrate=0, odd=False, nextDue=0):
+        """
+        Builds a table from column arrays, scalars are broadcast to every aircraft
+
+        Returns:
+            AircraftStates: the new table
+        """
+
+        icao = np.asarray(icao)
+        states = cls(len(icao))
+        states.count = len(icao)
+
+        values = {'icao': icao, 'lat': lat, 'lon': lon, 'alt': alt, 'east': east, 'north': north, 'vrate': vrate, 'odd': odd, 'nextDue': nextDue}
+        for name, value in values.items():
+            states.columns[name][:] = value
+
+        return states
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key][:self.count]
+
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("aircraft index out of range")
+
+        return AircraftView(self, key)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield AircraftView(self, index)
+
+    @property
+    def nbytes(self):
+        """
+        Bytes used by the aircraft in the table
+        """
+
+        return self.count * AIRCRAFT_DTYPE.itemsize
+
+    def append(self, icao, lat, lon, alt=0, east=0, north=0, vrate=0, odd=False, nextDue=0):
+        """
+        Adds an aircraft, doubling the columns when they are full
+
+        Args:
+            icao (int or string): ICAO address as an int or hex string
+            lat (float): latitude in degrees
+            lon (float): longitude in degrees
+            alt (int): altitude in feet
+            east (float): east velocity in knots
+            north (float): north velocity in knots
+            vrate (float): vertical rate in feet per minute
+            odd (bool): parity of the next position frame
+            nextDue (float): time the next frame is due
+        Returns:
+            AircraftView: the new aircraft
+        """
+
+        if isinstance(icao, str):
+            icao = int(icao, 16)
 
-    return preamble + encodedMsg + endSpace
+        if self.count == len(self.columns['icao']):
+            size = max(16, 2 * self.count)
+            for name, column in self.columns.items():
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[:self.count] = column[:self.count]
+                self.columns[name] = grown
 
+        view = AircraftView(self, self.count)
+        self.count += 1
+
+        view.icao, view.lat, view.lon, view.alt = icao, lat, lon, alt
+        view.east, view.north, view.vrate, view.odd, view.nextDue = east, north, vrate, odd, nextDue
+
+        return view
+
+    def due(self, now):
+        """
+        Rows of the aircraft whose next frame is due
+
+        Args:
+            now (float): the current time
+        Returns:
+            numpy array: row indexes
+        """
+
+        return np.flatnonzero(self['nextDue'] <= now)
+
+    def records(self):
+        """
+        Copies the table into a single AIRCRAFT_DTYPE structured array
+        """
+
+        records = np.empty(self.count, dtype=AIRCRAFT_DTYPE)
+        for name in AIRCRAFT_DTYPE.names:
+            records[name] = self[name]
+
+        return records
+
+#fleet velocity encoder
+def encodeVelocities(fleet):
+    """
+    Encodes velocity frames for a whole fleet in one pass
+
+    Args:
+        fleet (AircraftStates or numpy array): anything with icao, east, north, and vrate columns
+    Returns:
+        numpy array: (N, 14) uint8 array of frames including parity, one row per aircraft
+    """
+
+    return frameBatch(fleet['icao'], velocityBatch(fleet['east'], fleet['north'], fleet['vrate']))
+
+#rows encoded per chunk in batch mode, bounds memory use no matter how long the input is
+BATCH_CHUNK = 65536
+
+#batch row reader
+def readRows(lines, icao=0xA00000, alt=5000):
+    """
+    Parses input lines into fleet records one at a time
+
+    Each line is either:
+        icao, lat, lon, alt     - ICAO address in hex, position in degrees, altitude in feet
+        lon, lat                - the test.txt format imagePlotter.py writes, each point gets the next ICAO address
+    Blank lines, lines starting with #, and lines with an ICAO address outside 24 bits or an altitude
+    outside ALT_MIN to ALT_MAX are skipped.
+
+    Args:
+        lines (iterable): lines of text, a file or sys.stdin
+        icao (int): ICAO address given to the first lon, lat point
+        alt (int): altitude in feet given to lon, lat points
+    Returns:
+        generator: (icao, lat, lon, alt, odd) tuples, odd is always False
+    """
+
+    nextICAO = icao
+
+    for row in csv.reader(lines):
+        row = [field.strip() for field in row]
+
+        if len(row) == 0 or row[0] == '' or row[0].startswith('#'):
+            continue
+
+        try:
+            if len(row) == 4:
+                icaoValue = int(row[0], 16)
+                altValue = int(float(row[3]))
+
+                #out of range values would overflow the record fields and end the whole stream
+                if not 0 <= icaoValue <= 0xFFFFFF or not ALT_MIN <= altValue <= ALT_MAX:
+                    raise ValueError
+
+                yield icaoValue, float(row[1]), float(row[2]), altValue, False
+            elif len(row) == 2:
+                yield nextICAO, float(row[1]), float(row[0]), alt, False
+                nextICAO = (nextICAO + 1) & 0xFFFFFF
+            else:
+                raise ValueError
+        except ValueError:
+            #stdout may be carrying frames, so complaints go to stderr
+            print("Skipping invalid line: " + ','.join(row), file=sys.stderr)
+
+#batch chunker
+def chunkRows(rows, chunkSize=BATCH_CHUNK):
+    """
+    Groups fleet records into fixed size structured arrays
+
+    Args:
+        rows (iterable): (icao, lat, lon, alt, odd) tuples from readRows()
+        chunkSize (int): max records per chunk
+    Returns:
+        generator: FLEET_DTYPE arrays of up to chunkSize records
+    """
+
+    rows = iter(rows)
+
+    while True:
+        chunk = np.fromiter(itertools.islice(rows, chunkSize), dtype=FLEET_DTYPE, count=-1)
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+#batch encoder
+def encodeChunks(chunks, parity='both', workers=1, executor=None):
+    """
+    Encodes each chunk of the fleet into position frames
+
+    Args:
+        chunks (iterable): FLEET_DTYPE arrays from chunkRows()
+        parity (string): 'even', 'odd', or 'both' for an even frame followed by an odd frame per record
+        workers (int): shards per chunk, see encodeFleet()
+        executor (ProcessPoolExecutor): pool shared by every chunk, see encodeFleetParallel()
+    Returns:
+        generator: (N, 14) uint8 arrays of frames
+    """
+
+    for chunk in chunks:
+        if parity == 'both':
+            pairs = np.repeat(chunk, 2)
+            pairs['odd'][1::2] = True
+            yield encodeFleet(pairs, workers=workers, executor=executor)
+        else:
+            chunk['odd'] = parity == 'odd'
+            yield encodeFleet(chunk, workers=workers, executor=executor)
+
+#batch writer
+def writeFrames(frameChunks, out, outputFormat='hex'):
+    """
+    Writes frames to a binary stream as they are encoded
+
+    Args:
+        frameChunks (iterable): (N, 14) uint8 arrays from encodeChunks()
+        out (file): stream opened in binary mode
+        outputFormat (string): 'hex' for a line of hex per frame, 'binary' for a line of 0 and 1
+                               characters per frame (the adsbGen ASCII input format), 'raw' for the bare 14 bytes
+    Returns:
+        int: the number of frames written
+    """
+
+    numFrames = 0
+
+    for frames in frameChunks:
+        if outputFormat == 'raw':
+            out.write(frames.tobytes())
+        else:
+            if outputFormat == 'hex':
+                text = np.frombuffer(frames.tobytes().hex().encode(), dtype=np.uint8).reshape(len(frames), -1)
+            else:
+                text = np.unpackbits(frames, axis=1) + np.uint8(ord('0'))
+
+            lines = np.empty((len(frames), text.shape[1] + 1), dtype=np.uint8)
+            lines[:, :-1] = text
+            lines[:, -1] = ord('\n')
+            out.write(lines.tobytes())
+
+        numFrames += len(frames)
+
+    return numFrames
+
+#non interactive entry point
+def batchMain(argv=None):
+    """
+    Streams rows from a CSV file, a test.txt point file, or stdin into encoded position frames
+    """
+
+    parser = argparse.ArgumentParser(description="Encode ADS-B position frames in bulk")
+    parser.add_argument("input", nargs='?', default='-', help="CSV of icao, lat, lon, alt or a test.txt file of lon, lat, - for stdin")
+    parser.add_argument("-o", "--output", default='-', help="file to write frames to, - for stdout")
+    parser.add_argument("-f", "--format", choices=['hex', 'binary', 'raw'], default='hex', help="output format")
+    parser.add_argument("--parity", choices=['even', 'odd', 'both'], default='both', help="which CPR frames to emit per row")
+    parser.add_argument("--icao", default='a00000', help="first ICAO address (hex) given to lon, lat points")
+    parser.add_argument("--alt", type=int, default=5000, help="altitude in feet given to lon, lat points")
+    parser.add_argument("--workers", type=int, default=1, help="processes used to encode each chunk")
+    args = parser.parse_args(argv)
+
+    try:
+        startICAO = int(args.icao, 16)
+    except ValueError:
+        startICAO = -1
+
+    if not 0 <= startICAO <= 0xFFFFFF:
+        parser.error("--icao must be a 24 bit hex address")
+    if not ALT_MIN <= args.alt <= ALT_MAX:
+        parser.error(f"--alt must be between {str(ALT_MIN)} and {str(ALT_MAX)}")
+
+    inFile = sys.stdin if args.input == '-' else open(args.input, newline='')
+    outFile = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+
+    #one pool for the whole run rather than one per chunk
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+
+    try:
+        rows = readRows(inFile, startICAO, args.alt)
+        frames = encodeChunks(chunkRows(rows), args.parity, args.workers, pool)
+        numFrames = writeFrames(frames, outFile, args.format)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if inFile is not sys.stdin:
+            inFile.close()
+        if outFile is not sys.stdout.buffer:
+            outFile.close()
+
+    print(f"Encoded {str(numFrames)} frames", file=sys.stderr)
+
+#the message preamble to turn on IFF reciever, in 0.5us chips
+PREAMBLE = "1010000101000000"
+
+#quiet chips after each frame to give us room for when we transmit back to back
+END_SPACE_CHIPS = 300
+
+#Manchester lookup table method
+@lru_cache(maxsize=None)
+def sampleTable(multiplier=1, dtype=np.float32, low=0, high=1):
+    """
+    Byte to sample lookup table, each bit becomes a '10' (one) or '01' (zero) chip pair
+    and each chip is held for multiplier samples
+
+    Args:
+        multiplier (int): samples per 0.5us chip, 1 for 2Msps
+        dtype (numpy dtype): sample type, np.float32 or np.complex64
+        low (float or complex): sample value of a '0' chip
+        high (float or complex): sample value of a '1' chip
+    Returns:
+        tuple: ((256, 16 * multiplier) byte table, preamble samples), read only since they are shared
+    """
+
+    bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+
+    chips = np.empty((256, 8, 2), dtype=dtype)
+    chips[:, :, 0] = np.where(bits, high, low)
+    chips[:, :, 1] = np.where(bits, low, high)
+
+    table = np.repeat(chips.reshape(256, 16), multiplier, axis=1)
+    preamble = np.repeat(np.where(np.array(list(PREAMBLE)) == '1', high, low).astype(dtype), multiplier)
+
+    table.flags.writeable = False
+    preamble.flags.writeable = False
+
+    return table, preamble
+
+#sample count method
+def frameSamples(numBits=112, multiplier=1, endSpace=True):
+    """
+    Number of samples renderFrame() writes for a frame
+
+    Args:
+        numBits (int): bits in the frame
+        multiplier (int): samples per 0.5us chip
+        endSpace (bool): True to count the quiet chips after the frame
+    Returns:
+        int: the number of samples
+    """
+
+    return (len(PREAMBLE) + 2 * numBits + (END_SPACE_CHIPS if endSpace else 0)) * multiplier
+
+#frame to sample renderer
+def renderFrame(frame, out=None, numBits=None, multiplier=1, dtype=np.float32, low=0, high=1, endSpace=True):
+    """
+    Renders a frame straight to preamble plus Manchester encoded samples
+
+    Args:
+        frame (bytes or numpy array): the packed frame, MSB first, e.g. from buildFrame()
+        out (numpy array): buffer to write into, at least frameSamples() long, allocated if None
+        numBits (int): bits in the frame, defaults to every bit of every byte
+        multiplier (int): samples per 0.5us chip, 1 for 2Msps
+        dtype (numpy dtype): sample type when out is None, np.float32 or np.complex64
+        low (float or complex): sample value of a '0' chip and the end space
+        high (float or complex): sample value of a '1' chip
+        endSpace (bool): True to add the quiet chips after the frame
+    Returns:
+        numpy array: the part of out that was written
+    """
+
+    frame = np.frombuffer(frame, dtype=np.uint8) if isinstance(frame, (bytes, bytearray)) else np.asarray(frame, dtype=np.uint8)
+
+    if numBits is None:
+        numBits = len(frame) * 8
+
+    if out is None:
+        out = np.empty(frameSamples(numBits, multiplier, endSpace), dtype=dtype)
+
+    table, preamble = sampleTable(multiplier, out.dtype.type, low, high)
+    byteSamples = table.shape[1]
+    bitSamples = byteSamples // 8
+    numBytes = numBits // 8
+
+    out[:len(preamble)] = preamble
+    pos = len(preamble)
+
+    #whole bytes are copied from the table straight into out
+    np.take(table, frame[:numBytes], axis=0, out=out[pos:pos + numBytes * byteSamples].reshape(numBytes, byteSamples))
+    pos += numBytes * byteSamples
+
+    #any bits left over in a partial last byte
+    extra = (numBits % 8) * bitSamples
+    if extra:
+        out[pos:pos + extra] = table[frame[numBytes], :extra]
+        pos += extra
+
+    if endSpace:
+        out[pos:pos + END_SPACE_CHIPS * multiplier] = low
+        pos += END_SPACE_CHIPS * multiplier
+
+    return out[:pos]
+
+#batch frame to sample renderer
+def renderFrames(frames, out=None, multiplier=1, dtype=np.float32, low=0, high=1, endSpace=True):
+    """
+    Renders equal length frames back to back, e.g. the output of encodeFleet()
+
+    Args:
+        frames (numpy array): (N, frameBytes) uint8 array of frames
+        out (numpy array): buffer to write into, at least N * frameSamples() long, allocated if None
+        multiplier (int): samples per 0.5us chip, 1 for 2Msps
+        dtype (numpy dtype): sample type when out is None, np.float32 or np.complex64
+        low (float or complex): sample value of a '0' chip and the end space
+        high (float or complex): sample value of a '1' chip
+        endSpace (bool): True to add the quiet chips after every frame
+    Returns:
+        numpy array: the part of out that was written
+    """
+
+    frames = np.asarray(frames, dtype=np.uint8)
+    numFrames, numBytes = frames.shape
+    burst = frameSamples(numBytes * 8, multiplier, endSpace)
+
+    if out is None:
+        out = np.empty(numFrames * burst, dtype=dtype)
+
+    table, preamble = sampleTable(multiplier, out.dtype.type, low, high)
+    byteSamples = table.shape[1]
+
+    bursts = out[:numFrames * burst].reshape(numFrames, burst)
+    bodyEnd = len(preamble) + numBytes * byteSamples
+
+    bursts[:, :len(preamble)] = preamble
+    np.take(table, frames, axis=0, out=bursts[:, len(preamble):bodyEnd].reshape(numFrames, numBytes, byteSamples))
+    bursts[:, bodyEnd:] = low
+
+    return out[:numFrames * burst]
+
+#converts our string into the encoding style needed to transmit
+def encodeMsg(msg):
+    """
+    Mode S encoder that converts the given binary message into the Mode S encoding
+    Also adds preamble.
+
+    Kept for the ASCII output, renderFrame() gives samples directly.
+
+    Returns a binary string of the preamble and encoded message - note needs to transmit at 2Mbps
+    """
+
+    numBits = len(msg)
+    frame = np.packbits(np.frombuffer(msg.encode(), dtype=np.uint8) == ord('1'))
+
+    #render as ASCII characters, one byte per chip
+    return renderFrame(frame, numBits=numBits, dtype=np.uint8, low=ord('0'), high=ord('1')).tobytes().decode()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    #any arguments run the batch encoder, none keeps the interactive prompts
+    if len(sys.argv) > 1:
+        batchMain()
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+# Python script to measure how far CPR encoding moves positions, by encoding them with adsbTest and decoding them again
+
+import argparse # needed for command line options
+import numpy as np # needed for position math
+import time # needed for timing
+
+from gnuradio.adsb import cpr # needed for CPR decoding
+import adsbTest # needed for CPR encoding
+
+def readPoints(pointFile):
+    """
+    Reads the "lon, lat" points imagePlotter.py writes to test.txt
+
+    Args:
+        pointFile (str): path to the point file
+
+    Returns:
+        tuple: (lat, lon) float64 arrays in degrees
+    """
+
+    points = np.loadtxt(pointFile, delimiter=',', ndmin=2)
+
+    return points[:, 1], points[:, 0]
+
+def checkPositions(lat, lon, refLat=None, refLon=None):
+    """
+    CPR encodes every position as an even and odd frame, then decodes them globally and locally
+
+    Args:
+        lat (numpy array): intended latitudes in degrees
+        lon (numpy array): intended longitudes in degrees
+        refLat (float or numpy array): reference latitude for local decoding, defaults to the mean of the points
+        refLon (float or numpy array): reference longitude for local decoding, defaults to the mean of the points
+
+    Returns:
+        dict: error reports from cpr.positionError() for the 'global', 'even', and 'odd' decodes
+    """
+
+    if refLat is None:
+        refLat = float(np.mean(lat))
+    if refLon is None:
+        refLon = float(np.mean(lon))
+
+    even = np.zeros(len(lat), dtype=bool)
+    odd = np.ones(len(lat), dtype=bool)
+
+    latEven, lonEven = adsbTest.cprBatch(lat, lon, even)
+    latOdd, lonOdd = adsbTest.cprBatch(lat, lon, odd)
+
+    reports = {}
+    reports['global'] = cpr.positionError(lat, lon, *cpr.globalDecode(latEven, lonEven, latOdd, lonOdd, odd))
+    reports['even'] = cpr.positionError(lat, lon, *cpr.localDecode(latEven, lonEven, even, refLat, refLon))
+    reports['odd'] = cpr.positionError(lat, lon, *cpr.localDecode(latOdd, lonOdd, odd, refLat, refLon))
+
+    return reports
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Report the position error CPR encoding adds")
+    parser.add_argument("points", nargs='?', default='test.txt', help="point file in the imagePlotter test.txt format")
+    parser.add_argument("--random", type=int, default=0, help="check this many random positions instead of a file")
+    parser.add_argument("--ref", type=float, nargs=2, default=None, metavar=('LAT', 'LON'), help="reference position for local decoding")
+    args = parser.parse_args()
+
+    if args.random > 0:
+        rng = np.random.default_rng()
+        pointLat = rng.uniform(-85, 85, args.random)
+        pointLon = rng.uniform(-180, 180, args.random)
+
+        # random points are spread over the globe, so each one is its own local reference
+        ref = (pointLat, pointLon)
+    else:
+        pointLat, pointLon = readPoints(args.points)
+        ref = (None, None)
+
+    if args.ref is not None:
+        ref = args.ref
+
+    startTime = time.time()
+    results = checkPositions(pointLat, pointLon, *ref)
+    elapsed = time.time() - startTime
+
+    print(f"Checked {str(len(pointLat))} positions in {elapsed:.2f} seconds")
+    for name, report in results.items():
+        print(f"{name:>6}: {str(report['decoded'])}/{str(report['count'])} decoded, "
+              f"error mean {report['mean']:.2f} m, 95% {report['p95']:.2f} m, max {report['max']:.2f} m")
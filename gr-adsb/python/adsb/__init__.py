@@ -21,4 +21,5 @@ except ModuleNotFoundError:
 
 # import any pure python here
 from .adsbGen import adsbGen
+from .adsbDemod import adsbDemod
 #
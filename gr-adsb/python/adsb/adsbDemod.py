@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+
+import numpy # needed for numpy sample types
+from gnuradio import gr # needed for gnuradio
+import pmt # needed for message output
+
+from . import demod # needed for demodulation
+from . import cpr # needed for position pairing
+
+class adsbDemod(gr.sync_block):
+    """
+    Receives Mode S samples, finds DF17 frames, and publishes the decoded frames on the frames message port
+    """
+    def __init__(self, sampleRate=2000000, inputType='complex', threshold=0.1, dcOffset=0.0, verbose=False):
+
+        # Our minimum sample rate is 2MHz, twice that of the Mode S signal rate of 1MHz due to how we do Manchester encoding
+        self.multiplier = max(1, int(sampleRate / 2000000))
+        self.sampleRate = float(sampleRate)
+
+        self.threshold = float(threshold)
+        self.dcOffset = complex(dcOffset) if inputType == 'complex' else complex(dcOffset).real
+        self.verbose = bool(verbose)
+
+        # samples kept from the end of the last work call so frames on a boundary are not missed
+        self.overlap = demod.FRAME_CHIPS * self.multiplier
+        self.history = numpy.zeros(0, dtype=numpy.complex64 if inputType == 'complex' else numpy.float32)
+
+        # latest even and odd positions of each aircraft, for CPR pairing across work calls
+        self.pairs = cpr.PairTable(demod.PAIR_TIMEOUT)
+
+        # number of frames found so far
+        self.frameCount = 0
+
+        gr.sync_block.__init__(self,
+            name="adsbDemod",
+            in_sig=[numpy.complex64 if inputType == 'complex' else numpy.float32, ],
+            out_sig=None)
+
+        self.message_port_register_out(pmt.intern("frames"))
+
+
+    def work(self, input_items, output_items):
+        samples = input_items[0]
+
+        # stream index of the first sample in the history buffer
+        firstSample = self.nitems_read(0) - len(self.history)
+
+        block = numpy.concatenate((self.history, samples))
+        starts, frames = demod.findFrames(block, self.multiplier, self.threshold, self.dcOffset)
+
+        # frames that start in the overlap are found again next call with the rest of their samples
+        keepUntil = max(0, len(block) - self.overlap)
+        found = starts < keepUntil
+
+        decoded = demod.decodeFrames(starts[found] + firstSample, frames[found], self.sampleRate, self.pairs)
+
+        for record, frame in zip(decoded, frames[found]):
+            self.frameCount += 1
+
+            message = {'sample': int(record['sample']), 'icao': format(int(record['icao']), '06x'),
+                       'tc': int(record['tc']), 'frame': bytes(frame).hex()}
+            for key in ('alt', 'lat', 'lon'):
+                if not numpy.isnan(record[key]):
+                    message[key] = float(record[key])
+
+            if self.verbose:
+                print("Decoded frame: " + str(message))
+
+            self.message_port_pub(pmt.intern("frames"), pmt.to_pmt(message))
+
+        self.history = block[keepUntil:].copy()
+
+        return len(input_items[0])
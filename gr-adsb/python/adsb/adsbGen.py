@@ -7,15 +7,25 @@
 #
 
 
-import numpy # needed for numpy.float32
+import numpy # needed for numpy sample types
 from gnuradio import gr # needed for gnuradio
+import pmt # needed for stream tags
 import socket # needed for udp socket 
+import struct # needed for binary header errors
+import threading # needed for the receiver thread
+import time # needed for mapping wall clock times to samples
+import heapq # needed for the scheduled frame queue
+import json # needed for aircraft control messages
+from collections import deque # needed for passing samples from the receiver thread
+
+from . import modulator # needed for sample generation
+from . import squitter # needed for the built in aircraft table
 
 class adsbGen(gr.sync_block):
     """
     docstring for block adsbGen
     """
-    def __init__(self, ipAddress='0.0.0.0', portNum='7331', sampleRate=2000000):
+    def __init__(self, ipAddress='0.0.0.0', portNum='7331', sampleRate=2000000, bufferSize=1048576, maxPackets=64, socketBufferSize=0, threaded=False, outputType='float', amplitude=1.0, dcOffset=0.0, burstMode=False, txTime=False):
         
         # Our minimum sample rate is 2MHz, twice that of the Mode S signal rate of 1MHz due to how we do Manchester encoding
         if sampleRate < 2000000:
@@ -25,94 +35,472 @@ class adsbGen(gr.sync_block):
             self.multiplier = int(sampleRate / 2000000)
             print("Setting multiplier to: " + str(self.multiplier))
 
+        # kept for mapping wall clock transmit times onto the sample counter
+        self.sampleRate = float(sampleRate)
+
         # create UDP socket
         self.recSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         
+        # grow the kernel receive buffer so bursts of datagrams are not dropped between work calls
+        if int(socketBufferSize) > 0:
+            self.recSocket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(socketBufferSize))
+
         # bind socket
         self.recSocket.bind((str(ipAddress), int(portNum)))
 
         print(f"Binding Socket to: {str(ipAddress)} , {str(portNum)}")
 
-        # set socket to nonblocking
-        self.recSocket.setblocking(False)
-        self.recSocket.settimeout(0)
+        # when threaded the receiver thread owns the socket and work() never touches it
+        self.threaded = bool(threaded)
+
+        if self.threaded:
+            # short timeout so the receiver thread can notice when the flowgraph stops
+            self.recSocket.settimeout(0.1)
+        else:
+            # set socket to nonblocking
+            self.recSocket.setblocking(False)
+            self.recSocket.settimeout(0)
+
+        # reused for every datagram so large binary datagrams are read whole without a new allocation each time
+        self.receiveBuffer = bytearray(modulator.MAX_DATAGRAM)
+
+        # modulated sample blocks handed from the receiver thread to work()
+        self.sampleQueue = deque()
+
+        # samples waiting in sampleQueue, capped at the ring buffer size so a stalled flowgraph cannot grow memory without bound
+        self.queuedSamples = 0
+        self.queueLock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.receiver = None
+
+        # max number of datagrams read per work call
+        self.maxPackets = max(1, int(maxPackets))
+
+        # complex output saves a float to complex conversion block downstream
+        if outputType == 'complex':
+            self.outputType = numpy.complex64
+            self.idle = numpy.complex64(dcOffset)
+        else:
+            self.outputType = numpy.float32
+            self.idle = numpy.float32(complex(dcOffset).real)
+
+        # sample value of a '1' chip, quiet time sits at the dc offset
+        self.high = self.outputType(self.idle + float(amplitude))
+
+        # lookup tables for the preamble and Manchester encoding, built once for our multiplier
+        self.preamble = modulator.preambleSamples(self.multiplier, self.idle, self.high, self.outputType)
+        self.chipTable = modulator.chipTable(self.multiplier, self.idle, self.high, self.outputType)
+
+        # quiet time added after each frame of a binary datagram, not needed in burst mode where only airtime is sent
+        self.gapSamples = 0 if burstMode else modulator.GAP_CHIPS * self.multiplier
+
+        # remaining message buffer, sized in samples
+        self.messageRemaining = modulator.SampleRing(bufferSize, self.outputType)
 
-        # set mode S preamble
-        self.preamble = "1010000101000000"
+        # time ordered queue of (start sample, sequence number, samples) for timed frames
+        self.scheduled = []
+        self.scheduleCount = 0
 
-        # remaining message buffer
-        self.messageRemaining = ''
+        # tails of scheduled bursts that ran past the end of the last output buffer
+        self.carried = []
+
+        # wall clock time of sample 0, reset when the flowgraph starts
+        self.startTime = time.time()
+
+        # in burst mode only pending frames are output, marked with tx_sob and tx_eob tags
+        self.burstMode = bool(burstMode)
+
+        # add tx_time tags to timed frames in burst mode
+        self.txTime = bool(txTime)
+
+        # the burst currently being output in burst mode, and how much of it has been sent
+        self.currentBurst = None
+        self.burstOffset = 0
+
+        # simulated aircraft that squitter on their own, controlled with JSON messages
+        self.aircraft = squitter.AircraftTable()
         
         gr.sync_block.__init__(self,
             name="adsbGen",
             in_sig=None,
-            out_sig=[numpy.float32, ])
+            out_sig=[self.outputType, ])
 
 
-    def work(self, input_items, output_items):
-        out = output_items[0]
-        # <+signal processing here+>
-        out[:] = numpy.float32(0)
+    def start(self):
+        """
+        Records the wall clock time of the first sample and starts the receiver thread when running in threaded mode
+        """
+
+        self.startTime = time.time()
+
+        if self.threaded:
+            self.stopEvent.clear()
+            self.receiver = threading.Thread(target=self.receiveLoop, daemon=True)
+            self.receiver.start()
+
+        return True
+
+    def stop(self):
+        """
+        Stops the receiver thread if it is running
+        """
+
+        if self.receiver is not None:
+            self.stopEvent.set()
+            self.receiver.join()
+            self.receiver = None
+
+        return True
+
+    def receiveLoop(self):
+        """
+        Receiver thread, reads and modulates datagrams so work() only has to copy samples
+        """
+
+        while not self.stopEvent.is_set():
+            try:
+                size = self.recSocket.recv_into(self.receiveBuffer)
+                messages = self.modulateMessage(bytes(memoryview(self.receiveBuffer)[:size]))
+            except socket.timeout:
+                continue # no data received
+            except Exception as e:
+                # keep the thread alive, a dead receiver would silently stop the block from ever receiving again
+                print("Receiver error: " + str(e))
+                time.sleep(0.1)
+                continue
+
+            for startSample, message in messages:
+
+                # anything bigger than the whole buffer could never be sent
+                if startSample is None and len(message) > len(self.messageRemaining.buffer):
+                    print("Message larger than buffer, dropping message")
+                    continue
+
+                with self.queueLock:
+                    if self.queuedSamples + len(message) > len(self.messageRemaining.buffer):
+                        print("Message buffer full, dropping message")
+                        continue
+
+                    self.queuedSamples += len(message)
+
+                self.sampleQueue.append((startSample, message))
+
+    def modulateMessage(self, socketMessage):
+        """
+        Converts a received message into samples
+
+        Args:
+            socketMessage (bytes): an ASCII bit string, a binary datagram of packed frames, or a timed datagram
+
+        Returns:
+            list: (start sample, samples) tuples, start sample is None for frames to send as soon as possible
+        """
+
+        if socketMessage[:1] == b'{':
+            # aircraft control message, frames come from the aircraft table instead
+            self.updateAircraft(socketMessage)
+            return []
+
+        magic = socketMessage[:len(modulator.BINARY_MAGIC)]
+
+        if magic == modulator.BINARY_MAGIC:
+            # binary datagram, frames are already packed
+            try:
+                frames = modulator.parseBinary(socketMessage)
+            except (ValueError, struct.error) as e:
+                print("Received invalid binary message: " + str(e))
+                return []
+
+            return [(None, modulator.modulateFrames(frames, self.chipTable, self.preamble, self.gapSamples, self.idle))]
+
+        if magic == modulator.TIMED_MAGIC:
+            # timed datagram, each frame is placed at its own sample
+            try:
+                timeMode, times, frames = modulator.parseTimed(socketMessage)
+            except (ValueError, struct.error) as e:
+                print("Received invalid timed message: " + str(e))
+                return []
+
+            if timeMode == modulator.TIME_WALL:
+                startSamples = numpy.round((times / 1e9 - self.startTime) * self.sampleRate)
+            else:
+                startSamples = times
+
+            burstLength = len(self.preamble) + frames.shape[1] * self.chipTable.shape[1]
+            bursts = modulator.modulateFrames(frames, self.chipTable, self.preamble).reshape(len(frames), burstLength)
+
+            return [(max(0, int(startSample)), burst) for startSample, burst in zip(startSamples, bursts)]
+
+        # pack the bits and modulate the whole frame at once
+        frame, numBits = modulator.bitsToBytes(socketMessage)
+
+        return [(None, modulator.modulate(frame, numBits, self.chipTable, self.preamble))]
+
+    def currentTime(self):
+        """
+        Returns the scheduler time in seconds, sample time normally or wall clock time in burst mode
+        """
+
+        if self.burstMode:
+            return time.time() - self.startTime
+
+        return self.nitems_written(0) / self.sampleRate
+
+    def updateAircraft(self, socketMessage):
+        """
+        Applies a JSON aircraft control message to the aircraft table.
+        The message must have an "icao" hex string, and either "remove": true or any of
+        "lat", "lon", "alt" (feet), "east", "north" (knots), "vrate" (feet per minute), "callsign"
+
+        Args:
+            socketMessage (bytes): the JSON message
+        """
 
-        # try to receive data from socket
         try:
-            # this should be a binary string
-            socketMessage = self.recSocket.recv(4096).decode('utf-8')
+            update = json.loads(socketMessage)
+            if not isinstance(update, dict):
+                raise ValueError("expected a JSON object")
 
-            message = ""
+            icao = update.pop('icao')
+            if not isinstance(icao, str):
+                raise TypeError("ICAO address must be a hex string")
 
-            # add preamble with multiplier
-            for bit in self.preamble:
-                if bit == '1':
-                    message += '1' * self.multiplier
-                elif bit == '0':
-                    message += '0' * self.multiplier
-                else:
-                    print("Received invalid bit in preamble: " + str(bit))
-
-            # do manchester encoding with multiplier
-            for bit in socketMessage:
-                if bit == '1':
-                    message += '1' * self.multiplier
-                    message += '0' * self.multiplier
-                elif bit == '0':
-                    message += '0' * self.multiplier
-                    message += '1' * self.multiplier
-                else:
-                    print("Received invalid bit: " + str(bit))
-            
-            print("Generated message: " + str(message))
-            self.messageRemaining += message
-        except socket.error:
-            pass # no data received
-
-        # check if there is remaining message to send
-        if len(self.messageRemaining) > 0:
-
-            if len(self.messageRemaining) >= len(out):
-                # fill the output buffer
-                for i in range(len(out)):
-                    if self.messageRemaining[i] == '1':
-                        out[i] = numpy.float32(1)
-                    else:
-                        out[i] = numpy.float32(0)
-                
-                # update remaining message
-                self.messageRemaining = self.messageRemaining[len(out):]
+            icao = int(icao, 16)
+            if not 0 <= icao <= 0xFFFFFF:
+                raise ValueError("ICAO address must be 24 bits")
+
+            remove = bool(update.pop('remove', False))
+            fields = squitter.checkFields(update)
+        except (ValueError, KeyError, TypeError) as e:
+            print("Received invalid aircraft message: " + str(e))
+            return
+
+        if remove:
+            self.aircraft.remove(icao)
+        else:
+            self.aircraft.update(self.currentTime(), icao, **fields)
+
+    def queueSquitters(self, until):
+        """
+        Modulates every aircraft table frame due before the given time and schedules it at its exact sample
+
+        Args:
+            until (float): scheduler time in seconds to generate frames up to
+        """
+
+        for frameTime, frame in self.aircraft.due(until):
+            message = modulator.modulate(numpy.frombuffer(frame, dtype=numpy.uint8), 112, self.chipTable, self.preamble)
+            self.queueMessage(int(round(frameTime * self.sampleRate)), message)
+
+    def queueMessage(self, startSample, message):
+        """
+        Adds modulated samples to the remaining message buffer, or to the schedule if they have a start sample
+
+        Args:
+            startSample (int): the sample to start transmitting at, or None to send as soon as possible
+            message (numpy.ndarray): the samples to queue
+        """
+
+        if startSample is not None:
+            heapq.heappush(self.scheduled, (startSample, self.scheduleCount, message))
+            self.scheduleCount += 1
+        elif not self.messageRemaining.write(message):
+            print("Message buffer full, dropping message")
+
+    def placeCarried(self, out):
+        """
+        Writes the tails of bursts that ran past the end of the last output buffer at the start of this one
+
+        Args:
+            out (numpy.ndarray): the output buffer for this work call
+
+        Returns:
+            int: the number of samples at the start of out now in use
+        """
+
+        carried = self.carried
+        self.carried = []
+        used = 0
+
+        for message in carried:
+            count = min(len(message), len(out))
+            out[:count] = message[:count]
+            used = max(used, count)
+
+            if count < len(message):
+                self.carried.append(message[count:])
+
+        return used
+
+    def placeScheduled(self, out, cursor=0):
+        """
+        Writes every scheduled burst that starts inside this output buffer at its exact sample offset.
+        Late bursts are sent back to back from the cursor so they do not overwrite each other or immediate samples.
+        Bursts that run past the end of the buffer are carried over to finish in the next one.
 
+        Args:
+            out (numpy.ndarray): the output buffer for this work call
+            cursor (int): first sample of out that late bursts may use
+        """
+
+        firstSample = self.nitems_written(0)
+        endSample = firstSample + len(out)
+        late = []
+        sentLate = 0
+        placed = [] # (start, end) of each on time burst in out
+
+        while self.scheduled and self.scheduled[0][0] < endSample:
+            startSample, sequence, message = heapq.heappop(self.scheduled)
+
+            offset = startSample - firstSample
+            if offset < 0:
+                late.append((startSample, sequence, message))
             else:
-                # fill what we can
-                for i in range(len(self.messageRemaining)):
-                    if self.messageRemaining[i] == '1':
-                        out[i] = numpy.float32(1)
-                    else:
-                        out[i] = numpy.float32(0)
-                
-                # clear remaining message
-                self.messageRemaining = ''
+                placed.append((offset, self.placeBurst(out, offset, message)))
 
+        for startSample, sequence, message in late:
+            # move past any on time burst this one would run into
+            for start, end in placed:
+                if cursor < end and cursor + len(message) > start:
+                    cursor = end
 
-        
+            # no room left in this buffer, it stays late until the next one
+            if cursor >= len(out):
+                heapq.heappush(self.scheduled, (startSample, sequence, message))
+                continue
+
+            cursor = self.placeBurst(out, cursor, message)
+            sentLate += 1
+
+        if sentLate:
+            print(str(sentLate) + " scheduled messages were late, sending them now")
+
+    def placeBurst(self, out, offset, message):
+        """
+        Writes a burst into out at the given offset, carrying over anything past the end
+
+        Args:
+            out (numpy.ndarray): the output buffer for this work call
+            offset (int): the sample of out to start at
+            message (numpy.ndarray): the burst samples
+
+        Returns:
+            int: the offset just past the burst, at most the length of out
+        """
+
+        count = min(len(message), len(out) - offset)
+        out[offset:offset + count] = message[:count]
+
+        if count < len(message):
+            self.carried.append(message[count:])
+
+        return offset + count
+
+    def burstWork(self, out):
+        """
+        Fills out with pending bursts only, tagging the start and end of each one.
+        Immediate samples are sent first, then timed frames in time order, each timed frame as its own burst.
+        Timed frames are not held back until their time, instead they carry a tx_time tag if enabled so the sink can place them.
+
+        Args:
+            out (numpy.ndarray): the output buffer for this work call
+
+        Returns:
+            int: the number of samples written to out
+        """
+
+        produced = 0
+
+        while produced < len(out):
+
+            if self.currentBurst is None:
+                # start the next burst, immediate samples first
+                if len(self.messageRemaining) > 0:
+                    burst = numpy.empty(len(self.messageRemaining), dtype=self.outputType)
+                    self.messageRemaining.read(burst)
+                    burstTime = None
+                elif self.scheduled:
+                    startSample, _, burst = heapq.heappop(self.scheduled)
+                    burstTime = self.startTime + startSample / self.sampleRate
+                else:
+                    break # nothing pending
+
+                self.currentBurst = burst
+                self.burstOffset = 0
+
+                tagOffset = self.nitems_written(0) + produced
+                self.add_item_tag(0, tagOffset, pmt.intern("tx_sob"), pmt.PMT_T)
+
+                if self.txTime and burstTime is not None:
+                    seconds = int(burstTime)
+                    timeValue = pmt.make_tuple(pmt.from_uint64(seconds), pmt.from_double(burstTime - seconds))
+                    self.add_item_tag(0, tagOffset, pmt.intern("tx_time"), timeValue)
+
+            count = min(len(self.currentBurst) - self.burstOffset, len(out) - produced)
+            out[produced:produced + count] = self.currentBurst[self.burstOffset:self.burstOffset + count]
+
+            produced += count
+            self.burstOffset += count
+
+            # tag the last sample of the burst
+            if self.burstOffset == len(self.currentBurst):
+                self.add_item_tag(0, self.nitems_written(0) + produced - 1, pmt.intern("tx_eob"), pmt.PMT_T)
+                self.currentBurst = None
+
+        return produced
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+
+        if self.threaded:
+            # move what the receiver thread has modulated into the buffer, leaving the rest queued until there is room
+            while self.sampleQueue:
+                startSample, message = self.sampleQueue[0]
+
+                if startSample is None and len(message) > self.messageRemaining.free():
+                    break
+
+                self.queueMessage(*self.sampleQueue.popleft())
+
+                with self.queueLock:
+                    self.queuedSamples -= len(message)
+        else:
+            # read every datagram that is ready, up to our budget
+            for _ in range(self.maxPackets):
+                try:
+                    # this should be a binary string
+                    size = self.recSocket.recv_into(self.receiveBuffer)
+                except socket.error:
+                    break # no data received
+
+                socketMessage = bytes(memoryview(self.receiveBuffer)[:size])
+
+                for startSample, message in self.modulateMessage(socketMessage):
+                    self.queueMessage(startSample, message)
+
+        if self.burstMode:
+            # look slightly ahead so tx_time tags are not already late when they reach the sink
+            self.queueSquitters(self.currentTime() + 0.1)
+
+            produced = self.burstWork(out)
+
+            # nothing to send, back off briefly so the scheduler does not spin
+            if produced == 0:
+                time.sleep(0.001)
+
+            return produced
+
+        # <+signal processing here+>
+        out[:] = self.idle
+
+        # finish bursts cut off at the end of the last buffer, then fill what we can with any remaining message
+        cursor = self.placeCarried(out)
+        cursor += self.messageRemaining.read(out[cursor:])
+
+        # squitters from the aircraft table that start inside this buffer
+        self.queueSquitters((self.nitems_written(0) + len(out)) / self.sampleRate)
 
+        # timed frames go at their exact sample offsets
+        self.placeScheduled(out, cursor)
 
         return len(output_items[0])
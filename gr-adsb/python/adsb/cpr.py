@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+# CPR position decoding over NumPy arrays
+
+import numpy # needed for array math
+
+# number of latitude zones between the equator and a pole
+NZ = 15
+
+# 17 bit CPR values
+CPR_SCALE = 131072.0
+
+# NL transition latitudes, entry i is the latitude where NL drops from 59 - i to 58 - i
+NL_TRANSITIONS = numpy.degrees(numpy.arccos(numpy.sqrt((1 - numpy.cos(numpy.pi / (2 * NZ))) / (1 - numpy.cos(2 * numpy.pi / numpy.arange(59, 1, -1))))))
+
+def nl(lat):
+    """
+    Number of longitude zones for an array of latitudes
+
+    Args:
+        lat (numpy.ndarray): latitudes in degrees
+
+    Returns:
+        numpy.ndarray: NL values from 1 to 59
+    """
+
+    absLat = numpy.abs(lat)
+    zones = 59 - numpy.searchsorted(NL_TRANSITIONS, absLat, side='right')
+
+    return numpy.where(absLat == 87, 2, zones)
+
+def globalDecode(latEven, lonEven, latOdd, lonOdd, oddLatest):
+    """
+    Globally decodes pairs of even and odd airborne CPR positions
+
+    Args:
+        latEven, lonEven (numpy.ndarray): 17 bit CPR values from the even frames
+        latOdd, lonOdd (numpy.ndarray): 17 bit CPR values from the odd frames
+        oddLatest (numpy.ndarray): True where the odd frame is the newer one of the pair
+
+    Returns:
+        tuple: (lat, lon) arrays in degrees, NaN where the pair straddles a longitude zone boundary
+    """
+
+    yEven = numpy.asarray(latEven, dtype=numpy.float64) / CPR_SCALE
+    xEven = numpy.asarray(lonEven, dtype=numpy.float64) / CPR_SCALE
+    yOdd = numpy.asarray(latOdd, dtype=numpy.float64) / CPR_SCALE
+    xOdd = numpy.asarray(lonOdd, dtype=numpy.float64) / CPR_SCALE
+    oddLatest = numpy.asarray(oddLatest, dtype=bool)
+
+    # latitude zone index
+    j = numpy.floor(59 * yEven - 60 * yOdd + 0.5)
+
+    lat0 = (360.0 / 60) * (numpy.mod(j, 60) + yEven)
+    lat1 = (360.0 / 59) * (numpy.mod(j, 59) + yOdd)
+    lat0 = numpy.where(lat0 >= 270, lat0 - 360, lat0)
+    lat1 = numpy.where(lat1 >= 270, lat1 - 360, lat1)
+
+    lat = numpy.where(oddLatest, lat1, lat0)
+
+    # both frames have to be in the same longitude zone band
+    zones = nl(lat)
+    valid = nl(lat0) == nl(lat1)
+
+    # longitude zone index
+    m = numpy.floor(xEven * (zones - 1) - xOdd * zones + 0.5)
+
+    ni = numpy.maximum(zones - oddLatest.astype(numpy.int64), 1)
+    lon = (360.0 / ni) * (numpy.mod(m, ni) + numpy.where(oddLatest, xOdd, xEven))
+    lon = numpy.where(lon >= 180, lon - 360, lon)
+
+    return numpy.where(valid, lat, numpy.nan), numpy.where(valid, lon, numpy.nan)
+
+def localDecode(latCPR, lonCPR, odd, refLat, refLon):
+    """
+    Locally decodes single airborne CPR positions against a nearby reference position
+
+    Args:
+        latCPR, lonCPR (numpy.ndarray): 17 bit CPR values
+        odd (numpy.ndarray): True for odd frames, False for even
+        refLat, refLon (numpy.ndarray or float): reference position in degrees, within half a zone of the aircraft
+
+    Returns:
+        tuple: (lat, lon) arrays in degrees
+    """
+
+    y = numpy.asarray(latCPR, dtype=numpy.float64) / CPR_SCALE
+    x = numpy.asarray(lonCPR, dtype=numpy.float64) / CPR_SCALE
+    cpr = numpy.asarray(odd, dtype=numpy.int64)
+    refLat = numpy.asarray(refLat, dtype=numpy.float64)
+    refLon = numpy.asarray(refLon, dtype=numpy.float64)
+
+    # latitude zone holding the reference, nudged to the zone the CPR value is closest to
+    dlat = 360.0 / (4 * NZ - cpr)
+    j = numpy.floor(refLat / dlat) + numpy.floor(numpy.mod(refLat, dlat) / dlat - y + 0.5)
+    lat = dlat * (j + y)
+
+    zones = nl(lat) - cpr
+    dlon = numpy.where(zones > 0, 360.0 / numpy.maximum(zones, 1), 360.0)
+    m = numpy.floor(refLon / dlon) + numpy.floor(numpy.mod(refLon, dlon) / dlon - x + 0.5)
+    lon = dlon * (m + x)
+    lon = numpy.where(lon >= 180, lon - 360, lon)
+
+    return lat, lon
+
+class PairTable:
+    """
+    Latest even and odd position of every aircraft, hash indexed by ICAO, for pairing frames into global decodes
+    """
+
+    def __init__(self, timeout=10.0, capacity=1024):
+        """
+        Initialization method
+
+        Args:
+            timeout (float): how long an even or odd position stays usable for pairing, in the units of the frame times
+            capacity (int): number of aircraft rows to allocate up front, grows as needed
+        """
+
+        self.timeout = timeout
+
+        # ICAO to row in the arrays below
+        self.rows = {}
+
+        # column 0 is the latest even frame, column 1 the latest odd frame
+        self.time = numpy.full((capacity, 2), -numpy.inf)
+        self.latCPR = numpy.zeros((capacity, 2), dtype=numpy.uint32)
+        self.lonCPR = numpy.zeros((capacity, 2), dtype=numpy.uint32)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _lookup(self, icaos):
+        """
+        Finds or allocates the row of each given ICAO
+        """
+
+        indexes = numpy.empty(len(icaos), dtype=numpy.intp)
+
+        for i, icao in enumerate(icaos.tolist()):
+            row = self.rows.get(icao)
+            if row is None:
+                row = len(self.rows)
+                self.rows[icao] = row
+            indexes[i] = row
+
+        # double the arrays when they run out of rows
+        if len(self.rows) > len(self.time):
+            size = max(len(self.rows), 2 * len(self.time))
+            grow = size - len(self.time)
+
+            self.time = numpy.concatenate((self.time, numpy.full((grow, 2), -numpy.inf)))
+            self.latCPR = numpy.concatenate((self.latCPR, numpy.zeros((grow, 2), dtype=numpy.uint32)))
+            self.lonCPR = numpy.concatenate((self.lonCPR, numpy.zeros((grow, 2), dtype=numpy.uint32)))
+
+        return indexes
+
+    def pair(self, icao, odd, latCPR, lonCPR, times):
+        """
+        Pairs a time ordered batch of position frames with the latest opposite frame of the same aircraft,
+        from earlier in the batch or from earlier batches, then globally decodes every pair
+
+        Args:
+            icao (numpy.ndarray): 24 bit ICAO addresses
+            odd (numpy.ndarray): True for odd frames, False for even
+            latCPR, lonCPR (numpy.ndarray): 17 bit CPR values
+            times (numpy.ndarray): frame times, non decreasing
+
+        Returns:
+            tuple: (lat, lon) arrays in degrees, NaN where a frame has no partner in time or the pair straddles a zone boundary
+        """
+
+        icao = numpy.asarray(icao, dtype=numpy.uint32)
+        odd = numpy.asarray(odd, dtype=bool)
+        latCPR = numpy.asarray(latCPR, dtype=numpy.uint32)
+        lonCPR = numpy.asarray(lonCPR, dtype=numpy.uint32)
+        times = numpy.asarray(times, dtype=numpy.float64)
+
+        numFrames = len(icao)
+        lat = numpy.full(numFrames, numpy.nan)
+        lon = numpy.full(numFrames, numpy.nan)
+
+        if numFrames == 0:
+            return lat, lon
+
+        # one hash lookup per aircraft rather than per frame
+        unique, inverse = numpy.unique(icao, return_inverse=True)
+        rows = self._lookup(unique)[inverse]
+
+        # group frames by aircraft, keeping time order within each aircraft
+        order = numpy.argsort(rows, kind='stable')
+        sortedRows = rows[order]
+        sortedOdd = odd[order]
+        position = numpy.arange(numFrames)
+
+        groupStart = numpy.flatnonzero(numpy.concatenate(([True], sortedRows[1:] != sortedRows[:-1])))
+        groupStart = numpy.repeat(groupStart, numpy.diff(numpy.concatenate((groupStart, [numFrames]))))
+
+        # latest earlier frame of each parity within the same aircraft, -1 when there is none
+        latestEven = numpy.maximum.accumulate(numpy.where(~sortedOdd, position, -1))
+        latestOdd = numpy.maximum.accumulate(numpy.where(sortedOdd, position, -1))
+        partner = numpy.where(sortedOdd, latestEven, latestOdd)
+        inBatch = partner >= groupStart
+
+        # partner values, from the batch or from the table
+        partnerIndex = order[numpy.maximum(partner, 0)]
+        column = numpy.where(sortedOdd, 0, 1)
+
+        partnerTime = numpy.where(inBatch, times[partnerIndex], self.time[sortedRows, column])
+        partnerLat = numpy.where(inBatch, latCPR[partnerIndex], self.latCPR[sortedRows, column])
+        partnerLon = numpy.where(inBatch, lonCPR[partnerIndex], self.lonCPR[sortedRows, column])
+
+        paired = times[order] - partnerTime <= self.timeout
+        newer = order[paired]
+        oddLatest = odd[newer]
+
+        latEven = numpy.where(oddLatest, partnerLat[paired], latCPR[newer])
+        lonEven = numpy.where(oddLatest, partnerLon[paired], lonCPR[newer])
+        latOdd = numpy.where(oddLatest, latCPR[newer], partnerLat[paired])
+        lonOdd = numpy.where(oddLatest, lonCPR[newer], partnerLon[paired])
+
+        lat[newer], lon[newer] = globalDecode(latEven, lonEven, latOdd, lonOdd, oddLatest)
+
+        # keep the last frame of each parity of each aircraft for the next batch
+        column = odd.astype(numpy.intp)
+        _, lastReversed = numpy.unique((2 * rows + column)[::-1], return_index=True)
+        last = numFrames - 1 - lastReversed
+
+        self.time[rows[last], column[last]] = times[last]
+        self.latCPR[rows[last], column[last]] = latCPR[last]
+        self.lonCPR[rows[last], column[last]] = lonCPR[last]
+
+        return lat, lon
+
+def positionError(lat, lon, decodedLat, decodedLon):
+    """
+    Summarizes the distance between intended and decoded positions
+
+    Args:
+        lat, lon (numpy.ndarray): intended positions in degrees
+        decodedLat, decodedLon (numpy.ndarray): decoded positions in degrees, NaN where decoding failed
+
+    Returns:
+        dict: count, decoded, and the mean, 95th percentile, and max error in meters
+    """
+
+    lat = numpy.radians(numpy.asarray(lat, dtype=numpy.float64))
+    lon = numpy.radians(numpy.asarray(lon, dtype=numpy.float64))
+    decodedLat = numpy.radians(numpy.asarray(decodedLat, dtype=numpy.float64))
+    decodedLon = numpy.radians(numpy.asarray(decodedLon, dtype=numpy.float64))
+
+    # haversine distance on a spherical earth
+    a = numpy.sin((decodedLat - lat) / 2) ** 2 + numpy.cos(lat) * numpy.cos(decodedLat) * numpy.sin((decodedLon - lon) / 2) ** 2
+    error = 2 * 6371000.0 * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))
+    error = error[~numpy.isnan(error)]
+
+    report = {'count': len(lat), 'decoded': len(error), 'mean': numpy.nan, 'p95': numpy.nan, 'max': numpy.nan}
+
+    if len(error):
+        report['mean'] = float(error.mean())
+        report['p95'] = float(numpy.percentile(error, 95))
+        report['max'] = float(error.max())
+
+    return report
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+# Vectorized Mode S demodulator and DF17 decoder, for checking generated samples decode correctly
+
+import numpy # needed for array math
+
+from . import modulator # needed for the preamble pattern
+from . import encoder # needed for the CRC
+from . import cpr # needed for position decoding
+
+# chips in the preamble plus a 112 bit frame
+FRAME_CHIPS = len(modulator.PREAMBLE) + 2 * 112
+
+# preamble chips that should hold a pulse, the rest should be quiet
+PREAMBLE_HIGH = [i for i, chip in enumerate(modulator.PREAMBLE) if chip == '1']
+PREAMBLE_LOW = [i for i, chip in enumerate(modulator.PREAMBLE) if chip == '0']
+
+# how long an even or odd position stays usable for pairing, in seconds
+PAIR_TIMEOUT = 10.0
+
+# decoded frame record
+FRAME_DTYPE = numpy.dtype([('sample', numpy.int64), ('icao', numpy.uint32), ('tc', numpy.uint8),
+                           ('alt', numpy.float64), ('odd', numpy.bool_), ('latCPR', numpy.uint32), ('lonCPR', numpy.uint32),
+                           ('lat', numpy.float64), ('lon', numpy.float64)])
+
+def gillhamDecode(code):
+    """
+    Decodes a 12 bit Gillham altitude field
+
+    Args:
+        code (int): the altitude field, bits C1 A1 C2 A2 C4 A4 B1 Q B2 D2 B4 D4
+
+    Returns:
+        float: altitude in feet, NaN for an invalid code
+    """
+
+    bits = [(code >> (11 - i)) & 1 for i in range(12)]
+    c1, a1, c2, a2, c4, a4, b1, _, b2, d2, b4, d4 = bits
+
+    gray500 = 0
+    for bit in (d2, d4, a1, a2, a4, b1, b2, b4):
+        gray500 = (gray500 << 1) | bit
+    gray100 = (c1 << 2) | (c2 << 1) | c4
+
+    # gray to binary
+    n500 = 0
+    while gray500:
+        n500 = n500 ^ gray500
+        gray500 = gray500 >> 1
+
+    n100 = gray100 ^ (gray100 >> 1) ^ (gray100 >> 2)
+
+    if n100 in (0, 5, 6):
+        return numpy.nan
+    if n100 == 7:
+        n100 = 5
+    if n500 % 2:
+        n100 = 6 - n100
+
+    return float(n500 * 500 + n100 * 100 - 1300)
+
+def _altitudeTable():
+    """
+    Builds the lookup table from 12 bit altitude field to feet, Q bit and Gillham codes
+    """
+
+    table = numpy.empty(4096, dtype=numpy.float64)
+
+    for code in range(4096):
+        if code & 0x10:
+            table[code] = (((code & 0xFE0) >> 1) | (code & 0x00F)) * 25 - 1000
+        else:
+            table[code] = gillhamDecode(code)
+
+    return table
+
+ALTITUDE_TABLE = _altitudeTable()
+
+def findFrames(samples, multiplier, threshold=0.1, dcOffset=0):
+    """
+    Finds and slices every CRC valid 112 bit DF17/18 frame in a block of samples
+
+    Args:
+        samples (numpy.ndarray): float or complex samples
+        multiplier (int): number of samples per 0.5us chip
+        threshold (float): minimum mean amplitude of the preamble pulses
+        dcOffset (float or complex): the level of quiet time, removed before taking the magnitude
+
+    Returns:
+        tuple: (int64 array of frame start samples, (N, 14) uint8 array of frames)
+    """
+
+    magnitude = numpy.abs(numpy.asarray(samples) - dcOffset).astype(numpy.float32)
+
+    # energy of a chip starting at every sample
+    total = numpy.concatenate(([0.0], numpy.cumsum(magnitude, dtype=numpy.float64)))
+    chips = (total[multiplier:] - total[:-multiplier]).astype(numpy.float32)
+
+    # frame starts that leave room for a whole frame
+    numStarts = len(chips) - (FRAME_CHIPS - 1) * multiplier
+    if numStarts <= 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros((0, 14), dtype=numpy.uint8)
+
+    # correlate against the preamble, pulses against quiet chips
+    high = sum(chips[i * multiplier:i * multiplier + numStarts] for i in PREAMBLE_HIGH) / len(PREAMBLE_HIGH)
+    low = sum(chips[i * multiplier:i * multiplier + numStarts] for i in PREAMBLE_LOW) / len(PREAMBLE_LOW)
+    score = high - low
+
+    candidate = (high > 2 * low) & (high > threshold * multiplier)
+
+    # keep only local peaks of the correlation
+    candidate[1:] &= score[1:] >= score[:-1]
+    candidate[:-1] &= score[:-1] > score[1:]
+
+    starts = numpy.flatnonzero(candidate)
+    if len(starts) == 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros((0, 14), dtype=numpy.uint8)
+
+    # each bit is a one when its first chip has more energy than its second
+    offsets = (len(modulator.PREAMBLE) + 2 * numpy.arange(112)) * multiplier
+    firstChip = chips[starts[:, None] + offsets]
+    secondChip = chips[starts[:, None] + offsets + multiplier]
+    frames = numpy.packbits(firstChip > secondChip, axis=1)
+
+    # only extended squitters with good parity
+    parity = (frames[:, 11].astype(numpy.uint32) << 16) | (frames[:, 12].astype(numpy.uint32) << 8) | frames[:, 13]
+    df = frames[:, 0] >> 3
+    valid = ((df == 17) | (df == 18)) & (encoder.crc24Batch(frames[:, :11]) == parity)
+
+    starts = starts[valid]
+    frames = frames[valid]
+
+    # drop detections inside a frame that was already found
+    keep = []
+    frameEnd = -1
+    for i, start in enumerate(starts):
+        if start >= frameEnd:
+            keep.append(i)
+            frameEnd = start + FRAME_CHIPS * multiplier
+
+    return starts[keep].astype(numpy.int64), frames[keep]
+
+def decodeFrames(starts, frames, sampleRate, pairs=None):
+    """
+    Decodes the fields of DF17 frames and globally decodes airborne positions from even and odd pairs
+
+    Args:
+        starts (numpy.ndarray): frame start samples from findFrames()
+        frames (numpy.ndarray): (N, 14) uint8 frames from findFrames()
+        sampleRate (float): sample rate, used to time out stale position pairs
+        pairs (cpr.PairTable): latest even and odd positions of each aircraft, pass the same table to keep pairing across calls
+
+    Returns:
+        numpy.ndarray: FRAME_DTYPE records, alt, lat, and lon are NaN where the frame does not carry them
+    """
+
+    decoded = numpy.zeros(len(frames), dtype=FRAME_DTYPE)
+    decoded['sample'] = starts
+    decoded['alt'] = numpy.nan
+    decoded['lat'] = numpy.nan
+    decoded['lon'] = numpy.nan
+
+    if len(frames) == 0:
+        return decoded
+
+    frames = frames.astype(numpy.uint64)
+    decoded['icao'] = (frames[:, 1] << 16) | (frames[:, 2] << 8) | frames[:, 3]
+
+    me = numpy.zeros(len(frames), dtype=numpy.uint64)
+    for column in range(4, 11):
+        me = (me << numpy.uint64(8)) | frames[:, column]
+
+    tc = (me >> numpy.uint64(51)).astype(numpy.uint8)
+    decoded['tc'] = tc
+
+    # airborne position with barometric altitude
+    position = (tc >= 9) & (tc <= 18)
+
+    altCode = ((me >> numpy.uint64(36)) & numpy.uint64(0xFFF)).astype(numpy.intp)
+    decoded['alt'] = numpy.where(position, ALTITUDE_TABLE[altCode], numpy.nan)
+    decoded['odd'] = position & (((me >> numpy.uint64(34)) & numpy.uint64(1)) == 1)
+    decoded['latCPR'] = (me >> numpy.uint64(17)) & numpy.uint64(0x1FFFF)
+    decoded['lonCPR'] = me & numpy.uint64(0x1FFFF)
+
+    # pair each position with the latest opposite frame from the same aircraft
+    if pairs is None:
+        pairs = cpr.PairTable(PAIR_TIMEOUT)
+
+    newer = numpy.flatnonzero(position)
+    decoded['lat'][newer], decoded['lon'][newer] = pairs.pair(decoded['icao'][newer], decoded['odd'][newer],
+                                                              decoded['latCPR'][newer], decoded['lonCPR'][newer],
+                                                              starts[newer] / sampleRate)
+
+    return decoded
+
+def demodulate(samples, sampleRate, threshold=0.1, dcOffset=0):
+    """
+    Finds and decodes every DF17 frame in an array of samples
+
+    Args:
+        samples (numpy.ndarray): float or complex samples
+        sampleRate (float): sample rate, rounded down to a multiple of 2MHz for the chips
+        threshold (float): minimum mean amplitude of the preamble pulses
+        dcOffset (float or complex): the level of quiet time
+
+    Returns:
+        numpy.ndarray: FRAME_DTYPE records
+    """
+
+    multiplier = max(1, int(sampleRate / 2000000))
+    starts, frames = findFrames(samples, multiplier, threshold, dcOffset)
+
+    return decodeFrames(starts, frames, sampleRate)
+
+def demodulateFile(fileName, sampleRate, threshold=0.1, dcOffset=0, chunkSize=4194304):
+    """
+    Finds and decodes every DF17 frame in a complex64 .cfile, memory mapped and read one chunk at a time
+
+    Args:
+        fileName (str): path to the .cfile
+        sampleRate (float): sample rate of the capture
+        threshold (float): minimum mean amplitude of the preamble pulses
+        dcOffset (float or complex): the level of quiet time
+        chunkSize (int): number of samples processed at a time
+
+    Returns:
+        numpy.ndarray: FRAME_DTYPE records
+    """
+
+    multiplier = max(1, int(sampleRate / 2000000))
+    capture = numpy.memmap(fileName, dtype=numpy.complex64, mode='r')
+
+    # chunks overlap by a frame so frames on a boundary are still found, and are kept by the chunk they start in
+    overlap = FRAME_CHIPS * multiplier
+    allStarts = []
+    allFrames = []
+
+    for chunkStart in range(0, len(capture), chunkSize):
+        chunk = capture[chunkStart:chunkStart + chunkSize + overlap]
+        starts, frames = findFrames(chunk, multiplier, threshold, dcOffset)
+
+        inChunk = starts < chunkSize
+        allStarts.append(starts[inChunk] + chunkStart)
+        allFrames.append(frames[inChunk])
+
+    if not allStarts:
+        return decodeFrames(numpy.zeros(0, dtype=numpy.int64), numpy.zeros((0, 14), dtype=numpy.uint8), sampleRate)
+
+    return decodeFrames(numpy.concatenate(allStarts), numpy.concatenate(allFrames), sampleRate)
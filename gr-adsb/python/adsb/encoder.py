@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+# Helper functions for building DF17 extended squitter frames as bytes
+
+import math # needed for CPR math
+import numpy # needed for batch CRC
+
+# mode S CRC generator polynomial, without the leading x^24 term
+CRC_POLY = 0xFFF409
+
+# DF 17 is ADS-B, CA is 5 to match the rest of the project
+DF17_HEADER = (17 << 3) | 5
+
+# callsign characters, the index of each character is its 6 bit code
+CALLSIGN_CHARS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######"
+
+# number of latitude zones between the equator and a pole
+NZ = 15
+
+# altitude range in feet, 25 ft Q bit coding covers -1000 to 50175 and Gillham coding the rest
+ALT_MIN = -1200
+ALT_MAX = 126700
+
+def _crcTable():
+    """
+    Builds the byte at a time CRC lookup table
+    """
+
+    table = []
+
+    for byte in range(256):
+        value = byte << 16
+
+        for _ in range(8):
+            value = value << 1
+            if value & 0x1000000:
+                value = value ^ (0x1000000 | CRC_POLY)
+
+        table.append(value)
+
+    return table
+
+CRC_TABLE = _crcTable()
+
+def crc24(data):
+    """
+    Mode S CRC over the given bytes
+
+    Args:
+        data (bytes): the frame without parity, 11 bytes for an extended squitter
+
+    Returns:
+        int: 24 bit parity
+    """
+
+    value = 0
+
+    for byte in data:
+        value = ((value << 8) & 0xFFFFFF) ^ CRC_TABLE[(value >> 16) ^ byte]
+
+    return value
+
+def crc24Batch(frames):
+    """
+    Mode S CRC over many frames at once, one table lookup per byte column
+
+    Args:
+        frames (numpy.ndarray): (N, bytes) uint8 array, 11 bytes for an extended squitter without parity
+
+    Returns:
+        numpy.ndarray: N uint32 parity values
+    """
+
+    table = numpy.array(CRC_TABLE, dtype=numpy.uint32)
+    result = numpy.zeros(frames.shape[0], dtype=numpy.uint32)
+
+    for column in range(frames.shape[1]):
+        result = ((result << 8) & 0xFFFFFF) ^ table[(result >> 16) ^ frames[:, column]]
+
+    return result
+
+def buildFrame(icao, me):
+    """
+    Builds a complete DF17 frame
+
+    Args:
+        icao (int): 24 bit ICAO address
+        me (int): 56 bit ME field
+
+    Returns:
+        bytes: the 14 byte frame including parity
+    """
+
+    data = ((DF17_HEADER << 80) | ((icao & 0xFFFFFF) << 56) | (me & 0xFFFFFFFFFFFFFF)).to_bytes(11, 'big')
+
+    return data + crc24(data).to_bytes(3, 'big')
+
+def gillhamCode(alt):
+    """
+    12 bit altitude field with the Q bit clear, Gillham coded in 100 ft steps
+
+    Args:
+        alt (int): altitude in feet, a multiple of 100 between ALT_MIN and ALT_MAX
+
+    Returns:
+        int: the altitude field, bits C1 A1 C2 A2 C4 A4 B1 Q B2 D2 B4 D4
+    """
+
+    # 500 ft steps are gray coded, 100 ft steps use a 5 cycle code that runs backwards on odd 500s
+    n500 = (alt + 1200) // 500
+    n100 = (alt + 1300 - n500 * 500) // 100
+
+    if n500 % 2:
+        n100 = 6 - n100
+    if n100 == 5:
+        n100 = 7
+
+    gray500 = n500 ^ (n500 >> 1) # D2 D4 A1 A2 A4 B1 B2 B4
+    gray100 = n100 ^ (n100 >> 1) # C1 C2 C4
+
+    d2, d4, a1, a2, a4, b1, b2, b4 = [(gray500 >> (7 - i)) & 1 for i in range(8)]
+    c1, c2, c4 = [(gray100 >> (2 - i)) & 1 for i in range(3)]
+
+    code = 0
+    for bit in (c1, a1, c2, a2, c4, a4, b1, 0, b2, d2, b4, d4):
+        code = (code << 1) | bit
+
+    return code
+
+def altitudeCode(alt):
+    """
+    12 bit altitude field, 25 ft steps with the Q bit set where they reach, otherwise 100 ft Gillham coding
+
+    Args:
+        alt (float): barometric altitude in feet, clamped to ALT_MIN to ALT_MAX
+
+    Returns:
+        int: the altitude field
+    """
+
+    n = int((alt + 1000) / 25)
+
+    if alt >= -1000 and n <= 0x7FF:
+        return ((n & 0x7F0) << 1) | 0x10 | (n & 0x00F)
+
+    hundreds = int(round(max(ALT_MIN, min(ALT_MAX, alt)) / 100.0)) * 100
+
+    return gillhamCode(hundreds)
+
+def nl(lat):
+    """
+    Number of longitude zones at the given latitude
+
+    Args:
+        lat (float): latitude in degrees
+
+    Returns:
+        int: NL value from 1 to 59
+    """
+
+    if abs(lat) >= 87:
+        return 1 if abs(lat) > 87 else 2
+
+    return math.floor((2 * math.pi) / math.acos(1 - (1 - math.cos(math.pi / (2 * NZ))) / (math.cos(math.radians(lat)) ** 2)))
+
+def cprEncode(lat, lon, odd):
+    """
+    CPR encodes a position for an airborne position message
+
+    Args:
+        lat (float): latitude in degrees
+        lon (float): longitude in degrees
+        odd (bool): True for an odd frame, False for even
+
+    Returns:
+        tuple: (17 bit latitude, 17 bit longitude)
+    """
+
+    cpr = 1 if odd else 0
+
+    dlat = 360.0 / (4 * NZ - cpr)
+    yz = math.floor(131072 * (lat % dlat) / dlat + 0.5)
+
+    # the latitude the receiver will decode, used to pick the longitude zone size
+    rlat = dlat * (yz / 131072 + math.floor(lat / dlat))
+
+    zones = nl(rlat) - cpr
+    dlon = 360.0 / zones if zones > 0 else 360.0
+    xz = math.floor(131072 * (lon % dlon) / dlon + 0.5)
+
+    return yz & 0x1FFFF, xz & 0x1FFFF
+
+def positionFrame(icao, lat, lon, alt, odd):
+    """
+    Builds an airborne position frame, type code 11
+
+    Args:
+        icao (int): 24 bit ICAO address
+        lat (float): latitude in degrees
+        lon (float): longitude in degrees
+        alt (float): barometric altitude in feet
+        odd (bool): True for an odd frame, False for even
+
+    Returns:
+        bytes: the 14 byte frame
+    """
+
+    yz, xz = cprEncode(lat, lon, odd)
+
+    me = (11 << 51) | (altitudeCode(alt) << 36) | ((1 if odd else 0) << 34) | (yz << 17) | xz
+
+    return buildFrame(icao, me)
+
+def identificationFrame(icao, callsign, category=0):
+    """
+    Builds an identification frame, type code 4
+
+    Args:
+        icao (int): 24 bit ICAO address
+        callsign (str): up to 8 characters, padded with spaces
+        category (int): 3 bit emitter category
+
+    Returns:
+        bytes: the 14 byte frame
+    """
+
+    me = (4 << 51) | ((category & 0x7) << 48)
+
+    for i, char in enumerate(callsign.upper().ljust(8)[:8]):
+        code = CALLSIGN_CHARS.find(char)
+        if code < 0 or char == '#':
+            code = CALLSIGN_CHARS.index(' ')
+
+        me = me | (code << (42 - 6 * i))
+
+    return buildFrame(icao, me)
+
+def velocityFrame(icao, east, north, vrate):
+    """
+    Builds an airborne velocity frame, type code 19 subtype 1 (ground speed)
+
+    Args:
+        icao (int): 24 bit ICAO address
+        east (float): east velocity in knots, negative for west
+        north (float): north velocity in knots, negative for south
+        vrate (float): vertical rate in feet per minute, negative for descending
+
+    Returns:
+        bytes: the 14 byte frame
+    """
+
+    vew = min(1023, int(round(abs(east))) + 1)
+    vns = min(1023, int(round(abs(north))) + 1)
+    vr = min(511, int(round(abs(vrate) / 64)) + 1)
+
+    me = (19 << 51) | (1 << 48)
+    me = me | ((1 if east < 0 else 0) << 42) | (vew << 32)
+    me = me | ((1 if north < 0 else 0) << 31) | (vns << 21)
+    me = me | (1 << 20) | ((1 if vrate < 0 else 0) << 19) | (vr << 10)
+
+    return buildFrame(icao, me)
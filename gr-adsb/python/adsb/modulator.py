@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+# Helper functions for turning Mode S frames into samples with NumPy
+
+import numpy # needed for sample arrays
+import struct # needed for binary frame headers
+
+# mode S preamble, in 0.5us chips
+PREAMBLE = "1010000101000000"
+
+# quiet chips added after each frame of a binary datagram so back to back frames do not run together
+GAP_CHIPS = 300
+
+# binary datagram header: magic, bytes per frame (7 or 14), number of frames
+BINARY_MAGIC = b'MB'
+BINARY_HEADER = struct.Struct('>2sBH')
+
+# timed datagram header: magic, bytes per frame, time mode, number of frames
+# each frame is preceded by a big endian uint64 transmit time
+TIMED_MAGIC = b'MT'
+TIMED_HEADER = struct.Struct('>2sBBH')
+
+# largest datagram adsbGen reads, anything longer is truncated by the socket
+MAX_DATAGRAM = 65535
+
+# time modes for timed datagrams
+TIME_SAMPLE = 0 # absolute sample index in the output stream
+TIME_WALL = 1 # wall clock time in nanoseconds since the unix epoch
+
+def chipTable(multiplier, low=0, high=1, dtype=numpy.float32):
+    """
+    Builds the byte to chip lookup table used for Manchester encoding.
+    Each bit becomes a '10' (one) or '01' (zero) chip pair, and each chip is held for multiplier samples.
+
+    Args:
+        multiplier (int): number of samples per 0.5us chip
+        low (float or complex): sample value of a '0' chip
+        high (float or complex): sample value of a '1' chip
+        dtype (numpy.dtype): sample type, numpy.float32 or numpy.complex64
+
+    Returns:
+        numpy.ndarray: (256, 16 * multiplier) array, row n holds the samples for byte n
+    """
+
+    # MSB first bits of every possible byte value
+    bits = numpy.unpackbits(numpy.arange(256, dtype=numpy.uint8)[:, None], axis=1)
+
+    chips = numpy.empty((256, 8, 2), dtype=dtype)
+    chips[:, :, 0] = numpy.where(bits, high, low)
+    chips[:, :, 1] = numpy.where(bits, low, high)
+
+    return numpy.repeat(chips.reshape(256, 16), multiplier, axis=1)
+
+def preambleSamples(multiplier, low=0, high=1, dtype=numpy.float32):
+    """
+    Builds the Mode S preamble as samples
+
+    Args:
+        multiplier (int): number of samples per 0.5us chip
+        low (float or complex): sample value of a '0' chip
+        high (float or complex): sample value of a '1' chip
+        dtype (numpy.dtype): sample type, numpy.float32 or numpy.complex64
+
+    Returns:
+        numpy.ndarray: array of 16 * multiplier samples
+    """
+
+    chips = numpy.frombuffer(PREAMBLE.encode(), dtype=numpy.uint8) - ord('0')
+
+    return numpy.repeat(numpy.where(chips, high, low).astype(dtype), multiplier)
+
+def bitsToBytes(bitString):
+    """
+    Packs an ASCII string of '0' and '1' characters into bytes.
+    Any other characters are dropped.
+
+    Args:
+        bitString (bytes): the ASCII bit string, MSB first
+
+    Returns:
+        tuple: (numpy.ndarray of packed uint8, number of valid bits)
+    """
+
+    bits = numpy.frombuffer(bitString, dtype=numpy.uint8) - numpy.uint8(ord('0'))
+
+    # anything that is not a '0' or '1' wraps around to a value above 1
+    valid = bits <= 1
+    if not valid.all():
+        print("Received " + str(numpy.count_nonzero(~valid)) + " invalid bits, dropping them")
+        bits = bits[valid]
+
+    return numpy.packbits(bits), len(bits)
+
+def modulate(frame, numBits, table, preamble):
+    """
+    Converts a packed frame into preamble plus Manchester encoded samples
+
+    Args:
+        frame (numpy.ndarray): packed uint8 frame, MSB first
+        numBits (int): number of bits in the frame, anything past this in the last byte is padding
+        table (numpy.ndarray): lookup table from chipTable()
+        preamble (numpy.ndarray): preamble samples from preambleSamples()
+
+    Returns:
+        numpy.ndarray: samples for the whole burst
+    """
+
+    # each bit is two chips of multiplier samples
+    bitSamples = table.shape[1] // 8
+
+    body = table[frame].reshape(-1)[:numBits * bitSamples]
+
+    return numpy.concatenate((preamble, body))
+
+def modulateFrames(frames, table, preamble, gapSamples=0, idle=0):
+    """
+    Converts a batch of equal length packed frames into one block of samples
+
+    Args:
+        frames (numpy.ndarray): (N, frameBytes) uint8 array of frames, MSB first
+        table (numpy.ndarray): lookup table from chipTable()
+        preamble (numpy.ndarray): preamble samples from preambleSamples()
+        gapSamples (int): number of idle samples to add after each frame
+        idle (float or complex): sample value used for the gap
+
+    Returns:
+        numpy.ndarray: samples for every burst, back to back
+    """
+
+    numFrames = frames.shape[0]
+    bodySize = frames.shape[1] * table.shape[1]
+
+    bursts = numpy.full((numFrames, len(preamble) + bodySize + gapSamples), idle, dtype=table.dtype)
+    bursts[:, :len(preamble)] = preamble
+    bursts[:, len(preamble):len(preamble) + bodySize] = table[frames].reshape(numFrames, bodySize)
+
+    return bursts.reshape(-1)
+
+def packBinary(frames):
+    """
+    Builds a binary datagram holding one or more frames
+
+    Args:
+        frames (list): list of equal length frames as bytes, 7 or 14 bytes each
+
+    Returns:
+        bytes: the header followed by the raw frames
+    """
+
+    frameBytes = len(frames[0])
+
+    return BINARY_HEADER.pack(BINARY_MAGIC, frameBytes, len(frames)) + b''.join(frames)
+
+def parseBinary(datagram):
+    """
+    Unpacks a binary datagram made by packBinary()
+
+    Args:
+        datagram (bytes): the received datagram
+
+    Returns:
+        numpy.ndarray: (N, frameBytes) uint8 array of frames
+
+    Raises:
+        ValueError: if the header does not match the datagram
+    """
+
+    magic, frameBytes, numFrames = BINARY_HEADER.unpack_from(datagram)
+
+    if magic != BINARY_MAGIC or frameBytes not in (7, 14):
+        raise ValueError("Invalid binary frame header")
+
+    if numFrames == 0:
+        raise ValueError("Binary datagram has no frames")
+
+    if len(datagram) != BINARY_HEADER.size + frameBytes * numFrames:
+        raise ValueError("Binary datagram length does not match header")
+
+    frames = numpy.frombuffer(datagram, dtype=numpy.uint8, offset=BINARY_HEADER.size)
+
+    return frames.reshape(numFrames, frameBytes)
+
+def packTimed(frames, times, timeMode=TIME_SAMPLE):
+    """
+    Builds a timed datagram, where each frame has its own transmit time
+
+    Args:
+        frames (list): list of equal length frames as bytes, 7 or 14 bytes each
+        times (list): transmit time of each frame as an int, sample index or nanoseconds depending on timeMode
+        timeMode (int): TIME_SAMPLE or TIME_WALL
+
+    Returns:
+        bytes: the header followed by the time and frame records
+    """
+
+    frameBytes = len(frames[0])
+    records = b''.join(struct.pack('>Q', int(t)) + frame for t, frame in zip(times, frames))
+
+    return TIMED_HEADER.pack(TIMED_MAGIC, frameBytes, timeMode, len(frames)) + records
+
+def parseTimed(datagram):
+    """
+    Unpacks a timed datagram made by packTimed()
+
+    Args:
+        datagram (bytes): the received datagram
+
+    Returns:
+        tuple: (time mode, uint64 array of transmit times, (N, frameBytes) uint8 array of frames)
+
+    Raises:
+        ValueError: if the header does not match the datagram
+    """
+
+    magic, frameBytes, timeMode, numFrames = TIMED_HEADER.unpack_from(datagram)
+
+    if magic != TIMED_MAGIC or frameBytes not in (7, 14) or timeMode not in (TIME_SAMPLE, TIME_WALL):
+        raise ValueError("Invalid timed frame header")
+
+    if numFrames == 0:
+        raise ValueError("Timed datagram has no frames")
+
+    record = numpy.dtype([('time', '>u8'), ('frame', numpy.uint8, (frameBytes,))])
+
+    if len(datagram) != TIMED_HEADER.size + record.itemsize * numFrames:
+        raise ValueError("Timed datagram length does not match header")
+
+    records = numpy.frombuffer(datagram, dtype=record, offset=TIMED_HEADER.size)
+
+    return timeMode, records['time'].astype(numpy.uint64), records['frame']
+
+class SampleRing:
+    """
+    Fixed capacity ring buffer of samples waiting to be transmitted
+    """
+
+    def __init__(self, capacity, dtype=numpy.float32):
+        """
+        Initialization method
+
+        Args:
+            capacity (int): the max number of samples the buffer can hold, at least 1
+            dtype (numpy.dtype): sample type, numpy.float32 or numpy.complex64
+        """
+
+        self.buffer = numpy.zeros(max(1, int(capacity)), dtype=dtype)
+        self.readIndex = 0
+        self.writeIndex = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def free(self):
+        """
+        Returns the number of samples that can still be written
+        """
+
+        return len(self.buffer) - self.count
+
+    def write(self, samples):
+        """
+        Copies samples into the buffer, wrapping around the end if needed
+
+        Args:
+            samples (numpy.ndarray): the samples to add
+
+        Returns:
+            bool: True if the samples were added, False if there was not enough room
+        """
+
+        size = len(samples)
+        if size > self.free():
+            return False
+
+        first = min(size, len(self.buffer) - self.writeIndex)
+        self.buffer[self.writeIndex:self.writeIndex + first] = samples[:first]
+        self.buffer[:size - first] = samples[first:]
+
+        self.writeIndex = (self.writeIndex + size) % len(self.buffer)
+        self.count += size
+
+        return True
+
+    def read(self, out):
+        """
+        Copies as many samples as possible into out, wrapping around the end if needed
+
+        Args:
+            out (numpy.ndarray): the array to fill
+
+        Returns:
+            int: the number of samples copied into out
+        """
+
+        size = min(len(out), self.count)
+
+        first = min(size, len(self.buffer) - self.readIndex)
+        out[:first] = self.buffer[self.readIndex:self.readIndex + first]
+        out[first:size] = self.buffer[:size - first]
+
+        self.readIndex = (self.readIndex + size) % len(self.buffer)
+        self.count -= size
+
+        return size
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy # needed for sample arrays
+from gnuradio import gr_unittest
+
+try:
+    from gnuradio.adsb import modulator, encoder, demod
+except ImportError:
+    import os
+    import sys
+    dirname, filename = os.path.split(os.path.abspath(__file__))
+    sys.path.append(os.path.join(dirname, "bindings"))
+    from gnuradio.adsb import modulator, encoder, demod
+
+# (icao, lat, lon, alt) of the test aircraft
+AIRCRAFT = [(0xA0A000, 38.6001, -77.1622, 5000),
+            (0x4CA1F3, 52.2572, 3.9190, 38000),
+            (0x000001, -33.9461, 151.1772, -1000),
+            (0xFFFFFF, 64.1283, -21.9406, 12025)]
+
+class qa_demod(gr_unittest.TestCase):
+
+    def loopback(self, multiplier, low=0, high=1, dtype=numpy.float32):
+        """
+        Modulates an even and odd position frame for every test aircraft and demodulates them again
+
+        Returns:
+            numpy.ndarray: demod.FRAME_DTYPE records
+        """
+
+        frames = []
+        for icao, lat, lon, alt in AIRCRAFT:
+            frames.append(encoder.positionFrame(icao, lat, lon, alt, False))
+            frames.append(encoder.positionFrame(icao, lat, lon, alt, True))
+
+        frames = numpy.frombuffer(b''.join(frames), dtype=numpy.uint8).reshape(len(frames), 14)
+
+        table = modulator.chipTable(multiplier, low, high, dtype)
+        preamble = modulator.preambleSamples(multiplier, low, high, dtype)
+        samples = modulator.modulateFrames(frames, table, preamble, modulator.GAP_CHIPS * multiplier, low)
+
+        return demod.demodulate(samples, 2000000 * multiplier, dcOffset=low)
+
+    def checkDecoded(self, decoded):
+        """
+        Checks every frame was found and carries the right ICAO, altitude, and position
+        """
+
+        self.assertEqual(len(decoded), 2 * len(AIRCRAFT))
+
+        for i, (icao, lat, lon, alt) in enumerate(AIRCRAFT):
+            even, odd = decoded[2 * i], decoded[2 * i + 1]
+
+            self.assertEqual(even['icao'], icao)
+            self.assertEqual(odd['icao'], icao)
+            self.assertEqual(even['alt'], alt)
+            self.assertFalse(even['odd'])
+            self.assertTrue(odd['odd'])
+
+            # the odd frame completes the pair and is globally decoded
+            self.assertAlmostEqual(odd['lat'], lat, delta=1e-4)
+            self.assertAlmostEqual(odd['lon'], lon, delta=1e-4)
+
+    def test_001_loopback(self):
+        for multiplier in (1, 3, 4):
+            self.checkDecoded(self.loopback(multiplier))
+
+    def test_002_complex_offset(self):
+        self.checkDecoded(self.loopback(2, 0.2 + 0.1j, 0.2 + 1.1j, numpy.complex64))
+
+    def test_003_no_frames(self):
+        self.assertEqual(len(demod.demodulate(numpy.zeros(10000, dtype=numpy.float32), 2000000)), 0)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_demod)
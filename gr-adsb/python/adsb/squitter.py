@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 ZeeTwii.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+# Aircraft state table that generates its own extended squitters at the spec update rates
+
+import math # needed for dead reckoning
+import random # needed for squitter jitter
+import threading # needed for updates from the receiver thread
+
+from . import encoder # needed for building frames
+
+# squitter periods in seconds, randomized within these ranges like a real transponder
+POSITION_PERIOD = (0.4, 0.6)
+VELOCITY_PERIOD = (0.4, 0.6)
+IDENTIFICATION_PERIOD = (4.8, 5.2)
+
+# numeric aircraft fields, lat and lon in degrees, alt in feet, east and north in knots, vrate in feet per minute
+NUMBER_FIELDS = ('lat', 'lon', 'alt', 'east', 'north', 'vrate')
+
+def checkFields(fields):
+    """
+    Validates and converts aircraft fields before they are applied
+
+    Args:
+        fields (dict): any of lat, lon, alt, east, north, vrate, callsign
+
+    Returns:
+        dict: the fields with numbers as floats and the callsign as a string
+
+    Raises:
+        ValueError: for an unknown field, a number that is not finite, or an altitude out of range
+        TypeError: for a number field that is not a number or numeric string
+    """
+
+    checked = {}
+
+    for key, value in fields.items():
+        if key in NUMBER_FIELDS:
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError("Aircraft field " + key + " is not finite")
+            if key == 'alt' and not encoder.ALT_MIN <= value <= encoder.ALT_MAX:
+                raise ValueError("Aircraft altitude must be between " + str(encoder.ALT_MIN) + " and " + str(encoder.ALT_MAX) + " ft")
+        elif key == 'callsign':
+            value = str(value)
+        else:
+            raise ValueError("Unknown aircraft field: " + str(key))
+
+        checked[key] = value
+
+    return checked
+
+class Aircraft:
+    """
+    State of one simulated aircraft
+    """
+
+    def __init__(self, icao, now):
+        """
+        Initialization method
+
+        Args:
+            icao (int): 24 bit ICAO address
+            now (float): the current scheduler time in seconds
+        """
+
+        self.icao = icao
+        self.lat = 0.0
+        self.lon = 0.0
+        self.alt = 0.0
+        self.east = 0.0 # knots
+        self.north = 0.0 # knots
+        self.vrate = 0.0 # feet per minute
+        self.callsign = None
+
+        # time the state above was valid at, used for dead reckoning
+        self.stateTime = now
+
+        # stagger the first squitters so aircraft added together do not collide
+        self.nextPosition = now + random.uniform(0, POSITION_PERIOD[1])
+        self.nextVelocity = now + random.uniform(0, VELOCITY_PERIOD[1])
+        self.nextIdentification = now + random.uniform(0, IDENTIFICATION_PERIOD[1])
+
+        # next position frame parity, alternates even and odd
+        self.odd = False
+
+    def extrapolate(self, when):
+        """
+        Dead reckons the aircraft state forward using its velocity
+
+        Args:
+            when (float): the scheduler time to extrapolate to
+
+        Returns:
+            tuple: (lat, lon, alt) at that time
+        """
+
+        hours = (when - self.stateTime) / 3600.0
+
+        # one minute of latitude is one nautical mile
+        lat = self.lat + (self.north * hours) / 60.0
+        lon = self.lon + (self.east * hours) / (60.0 * max(0.01, math.cos(math.radians(self.lat))))
+        alt = self.alt + self.vrate * hours * 60.0
+
+        lon = ((lon + 180.0) % 360.0) - 180.0
+        lat = max(-90.0, min(90.0, lat))
+
+        return lat, lon, alt
+
+class AircraftTable:
+    """
+    Table of simulated aircraft that emits position, velocity, and identification frames when they are due
+    """
+
+    def __init__(self):
+        """
+        Initialization method
+        """
+
+        self.aircraft = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.aircraft)
+
+    def update(self, now, icao, **fields):
+        """
+        Adds an aircraft or updates its state.  Fields not given keep their dead reckoned values.
+
+        Args:
+            now (float): the current scheduler time in seconds
+            icao (int): 24 bit ICAO address
+            **fields: any of lat, lon, alt, east, north, vrate, callsign
+
+        Raises:
+            ValueError, TypeError: for invalid fields, see checkFields(), the table is left unchanged
+        """
+
+        fields = checkFields(fields)
+
+        with self.lock:
+            plane = self.aircraft.get(icao)
+
+            if plane is None:
+                plane = Aircraft(icao, now)
+                self.aircraft[icao] = plane
+            else:
+                # move the stored state up to now before applying the update
+                plane.lat, plane.lon, plane.alt = plane.extrapolate(now)
+                plane.stateTime = now
+
+            for key in NUMBER_FIELDS:
+                if key in fields:
+                    setattr(plane, key, fields[key])
+
+            if 'callsign' in fields:
+                plane.callsign = fields['callsign']
+
+    def remove(self, icao):
+        """
+        Removes an aircraft from the table
+
+        Args:
+            icao (int): 24 bit ICAO address
+        """
+
+        with self.lock:
+            self.aircraft.pop(icao, None)
+
+    def due(self, until):
+        """
+        Builds every frame that is due before the given time
+
+        Args:
+            until (float): scheduler time in seconds to generate frames up to
+
+        Returns:
+            list: list of (time, frame bytes) tuples
+        """
+
+        frames = []
+
+        with self.lock:
+            for plane in self.aircraft.values():
+
+                while plane.nextPosition < until:
+                    lat, lon, alt = plane.extrapolate(plane.nextPosition)
+                    frames.append((plane.nextPosition, encoder.positionFrame(plane.icao, lat, lon, alt, plane.odd)))
+                    plane.odd = not plane.odd
+                    plane.nextPosition += random.uniform(*POSITION_PERIOD)
+
+                while plane.nextVelocity < until:
+                    frames.append((plane.nextVelocity, encoder.velocityFrame(plane.icao, plane.east, plane.north, plane.vrate)))
+                    plane.nextVelocity += random.uniform(*VELOCITY_PERIOD)
+
+                while plane.nextIdentification < until:
+                    if plane.callsign is not None:
+                        frames.append((plane.nextIdentification, encoder.identificationFrame(plane.icao, plane.callsign)))
+                    plane.nextIdentification += random.uniform(*IDENTIFICATION_PERIOD)
+
+        return frames
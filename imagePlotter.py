@@ -15,6 +15,8 @@ from PIL import Image # needed for debugging
 import pandas as pd # debugging
 import matplotlib.pyplot as plt # needed for visualization
 
+import adsbTest # needed for the shared aircraft state table
+
 class ImagePlotter:
     """
     Class that handles converting image points into lat lon coordinates
@@ -123,6 +125,25 @@ class ImagePlotter:
 
         return self.__pixelsToCoords(targetPixels)
 
+    def getStates(self, numTargets, icao=0xA00000, alt=5000, visualize=False):
+        """
+        Pulls coordinates from the loaded image like getCoords, as a table of aircraft ready for the batch encoders
+
+        Args:
+            numTargets (int): the number of aircraft to make up the image
+            icao (int): ICAO address of the first aircraft, the rest count up from it
+            alt (int): altitude in feet of every aircraft
+            visualize (bool): display the points that will be transmitted
+
+        Returns:
+            adsbTest.AircraftStates: one aircraft per coordinate
+        """
+
+        coords = np.asarray(self.getCoords(numTargets, visualize), dtype=np.float64).reshape(-1, 2)
+        icaos = (icao + np.arange(len(coords))) & 0xFFFFFF
+
+        return adsbTest.AircraftStates.fromColumns(icaos, coords[:, 0], coords[:, 1], alt)
+
     def __pixelsToCoords(self, targetPixels):
         '''
         Takes a list of pixels and returns a list of coordinates
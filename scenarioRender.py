@@ -0,0 +1,132 @@
+# Python script to render an ADS-B scenario straight to a .cfile without running a flowgraph
+
+import argparse # needed for command line options
+import csv # needed for reading scenario files
+import numpy as np # needed for sample math
+
+from gnuradio.adsb import modulator # needed for the same modulation adsbGen uses
+import adsbTest # needed for frame encoding
+
+def readScenario(scenarioFile):
+    """
+    Reads a scenario file into a time ordered list of frames
+
+    Each line is either:
+        time, frame                          - a raw frame in hex (14 or 28 characters)
+        time, icao, lat, lon, alt, odd       - an aircraft position encoded with adsbTest, odd is 0 or 1
+    Time is in seconds from the start of the capture.  Blank lines and lines starting with # are skipped.
+
+    Args:
+        scenarioFile (str): path to the scenario file
+
+    Returns:
+        list: list of [time, frame bytes] sorted by time
+    """
+
+    events = []
+
+    with open(scenarioFile, newline='') as scenario:
+        for row in csv.reader(scenario):
+            row = [field.strip() for field in row]
+
+            if len(row) == 0 or row[0] == '' or row[0].startswith('#'):
+                continue
+
+            if len(row) == 2:
+                frame = bytes.fromhex(row[1])
+            elif len(row) == 6:
+                icao, lat, lon, alt, odd = row[1], float(row[2]), float(row[3]), int(row[4]), row[5] == '1'
+
+                frame = adsbTest.positionFrame(icao, lat, lon, alt, odd)
+            else:
+                print("Skipping invalid scenario line: " + ','.join(row))
+                continue
+
+            events.append([float(row[0]), frame])
+
+    events.sort(key=lambda event: event[0])
+
+    return events
+
+def render(events, outFile, sampleRate=2000000, amplitude=1.0, dcOffset=0, duration=None, chunkSize=1048576):
+    """
+    Renders the scenario into a complex64 .cfile, one chunk at a time so long captures never sit fully in memory
+
+    Args:
+        events (list): time ordered list of [time, frame bytes] from readScenario()
+        outFile (str): path of the .cfile to write
+        sampleRate (float): output sample rate, rounded down to a multiple of 2MHz for the chips
+        amplitude (float): sample value of a '1' chip above the dc offset
+        dcOffset (complex): sample value of quiet time
+        duration (float): capture length in seconds, defaults to just past the last frame
+        chunkSize (int): number of samples rendered and written at a time
+
+    Returns:
+        int: the number of samples written
+    """
+
+    multiplier = max(1, int(sampleRate / 2000000))
+
+    idle = np.complex64(dcOffset)
+    high = np.complex64(idle + amplitude)
+    table = modulator.chipTable(multiplier, idle, high, np.complex64)
+    preamble = modulator.preambleSamples(multiplier, idle, high, np.complex64)
+
+    # start sample of each frame
+    starts = [int(round(event[0] * sampleRate)) for event in events]
+
+    # longest burst, a 112 bit frame
+    burstSize = len(preamble) + 14 * table.shape[1]
+
+    if duration is None:
+        totalSamples = (starts[-1] + burstSize) if starts else 0
+    else:
+        totalSamples = int(round(duration * sampleRate))
+
+    chunk = np.empty(chunkSize, dtype=np.complex64)
+    nextEvent = 0 # next frame that has not started yet
+    active = [] # [start sample, samples] of frames that run into the current chunk
+
+    with open(outFile, 'wb') as capture:
+        for chunkStart in range(0, totalSamples, chunkSize):
+            chunkEnd = min(chunkStart + chunkSize, totalSamples)
+            out = chunk[:chunkEnd - chunkStart]
+            out[:] = idle
+
+            # modulate every frame that starts inside this chunk
+            while nextEvent < len(events) and starts[nextEvent] < chunkEnd:
+                frame = np.frombuffer(events[nextEvent][1], dtype=np.uint8)
+                active.append([starts[nextEvent], modulator.modulate(frame, len(frame) * 8, table, preamble)])
+                nextEvent += 1
+
+            stillActive = []
+            for start, samples in active:
+                first = max(start, chunkStart)
+                last = min(start + len(samples), chunkEnd)
+
+                if last > first:
+                    out[first - chunkStart:last - chunkStart] = samples[first - start:last - start]
+
+                if start + len(samples) > chunkEnd:
+                    stillActive.append([start, samples])
+            active = stillActive
+
+            out.tofile(capture)
+
+    return totalSamples
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Render an ADS-B scenario to a complex64 .cfile as fast as possible")
+    parser.add_argument("scenario", help="scenario file, see readScenario() for the format")
+    parser.add_argument("output", help="the .cfile to write")
+    parser.add_argument("--rate", type=float, default=2000000, help="sample rate in Hz")
+    parser.add_argument("--amplitude", type=float, default=1.0, help="amplitude of a '1' chip")
+    parser.add_argument("--offset", type=complex, default=0, help="dc offset of the output")
+    parser.add_argument("--duration", type=float, default=None, help="capture length in seconds")
+    args = parser.parse_args()
+
+    scenarioEvents = readScenario(args.scenario)
+    numSamples = render(scenarioEvents, args.output, args.rate, args.amplitude, args.offset, args.duration)
+
+    print(f"Wrote {str(len(scenarioEvents))} frames, {str(numSamples)} samples to {args.output}")